@@ -11,7 +11,7 @@
 # TODO5 Email Verification [0] SMTP/SendGrid
 
 # TODO6 Token Management [0] Refresh tokens
-# TODO7 Rate Limiting [0] Redis-based
+# TODO7 Rate Limiting [1] Redis-based
 # TODO8 API Documentation [0] Swagger/OpenAPI
 # TODO9 Audit Logging [0] Security events
 
@@ -21,10 +21,10 @@
 
 # TODOEXTRA WebAuthn Support [0] Biometric auth
 # TODOEXTRA Device Authorization Flow [0] TV/CLI devices
-# TODOEXTRA Token Introspection [0] RFC 7662
+# TODOEXTRA Token Introspection [1] RFC 7662
 
 # TODO13 CI/CD Pipeline [0] GitHub Actions
-# TODO14 Monitoring [0] Prometheus/Grafana
+# TODO14 Monitoring [1] Prometheus/Grafana
 # TODO15 Internationalization [0] i18n
 
 # global_TODO Deployment [0] Docker+K8s
@@ -35,21 +35,34 @@
 
 from starlette.middleware.sessions import SessionMiddleware
 from fastapi import FastAPI
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from logging.config import dictConfig
 import uvicorn
 import logging
+import asyncio
 
 from src.core.config.config import settings
 from src.core.dependencies.db_helper import db_helper
+from src.core.dependencies.redis_helper import redis_helper
+from src.core.dependencies.metrics import clear_multiproc_dir, mark_worker_dead, reap_dead_workers
+from src.core.services.auth.hash_executor import hash_executor
+from src.core.services.auth.user_import import import_executor
+from src.core.services.auth.revocation_list import revocation_list
+from src.core.services.auth.token_reaper import token_reaper
+from src.core.middleware.profiler import request_profiler
+from src.core.middleware.server_timing import ServerTimingMiddleware
 from src.core.config.logger import LOG_CONFIG
 from src.core.config.auth_config import SECRET_KEY
 
 from src.api.v1.endpoints.healthcheck import router as health_router
 from src.api.v1.endpoints.main_router import router as main_router
 from src.api.v1.auth.authentication import router as auth_router
+from src.api.v1.auth.introspection import router as introspection_router
 #from src.api.v1.auth.social_auth import router as social_auth_router
 from src.api.v1.endpoints.side_router_1 import router as side_router_1
+from src.api.v1.endpoints.well_known import router as well_known_router
+from src.api.v1.endpoints.user_import import router as user_import_router
+from src.api.v1.endpoints.metrics import router as metrics_router
 
 
 app = FastAPI()
@@ -60,26 +73,61 @@ app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
 async def lifespan(app: FastAPI):
     dictConfig(LOG_CONFIG)
     logger = logging.getLogger(__name__)
+    reap_dead_workers()
+    background_tasks = [
+        asyncio.create_task(revocation_list.run(settings.revocation.rebuild_interval))
+    ]
+    if settings.reaper.enabled:
+        background_tasks.append(asyncio.create_task(token_reaper.run()))
     
     yield  # FastAPI handles requests here
 
+    for task in background_tasks:
+        task.cancel()
+    for task in background_tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    hash_executor.shutdown()
+    import_executor.shutdown()
+    request_profiler.stop()
+    mark_worker_dead()
+
     try:
         await db_helper.dispose()
         logger.info("✅ Connection pool closed cleanly")
     except Exception as e:
         logger.warning(f"⚠️ Error closing connection pool: {e}")
 
+    try:
+        await redis_helper.dispose()
+        logger.info("✅ Redis connection closed cleanly")
+    except Exception as e:
+        logger.warning(f"⚠️ Error closing Redis connection: {e}")
+
 
 app = FastAPI(lifespan=lifespan)
 
+if settings.profiling.enabled:
+    app.add_middleware(
+        ServerTimingMiddleware,
+        add_header=settings.profiling.server_timing,
+        profiler=request_profiler if settings.profiling.sample_rate or settings.profiling.slow_ms else None
+    )
+
 
 app.include_router(health_router)
 app.include_router(main_router)
 app.include_router(auth_router)
+app.include_router(introspection_router)
 app.include_router(side_router_1)
+app.include_router(well_known_router)
+app.include_router(user_import_router)
+if settings.metrics.enabled:
+    app.include_router(metrics_router)
 
 
 if __name__ == '__main__':
+    clear_multiproc_dir()
     uvicorn.run(
         'main:app',
         host=settings.run.host,
@@ -0,0 +1,90 @@
+"""
+Database round trips per login.
+
+Creates a throwaway user in the configured database, logs it in repeatedly through
+UserService.authenticate_user and counts what reaches the server per login:
+statements, BEGINs and COMMITs/ROLLBACKs. The user and its tokens are removed afterwards.
+
+The login used to take about six statements and three commits
+(select, re-select, update, refresh, insert, refresh); it is now the
+credential SELECT, then one UPDATE ... RETURNING and one INSERT ... RETURNING
+in a single transaction.
+
+    python -m scripts.benchmarks.login_round_trips --logins 50
+"""
+from sqlalchemy import event, delete
+from collections import Counter
+from secrets import token_hex
+import argparse
+import asyncio
+import time
+
+from src.core.dependencies.db_helper import db_helper
+from src.core.services.auth.hash_executor import hash_executor
+from src.core.services.auth.token_service import TokenService
+from src.core.services.auth.user_service import UserService
+from src.core.services.cache.user_cache import user_cache
+from src.core.services.database.postgres.models.refresh_token import RefreshTokenModel
+from src.core.services.database.postgres.models.user import UserModel
+
+
+def _count(counter: Counter) -> None:
+    engine = db_helper.engine.sync_engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def statement(conn, cursor, sql, parameters, context, executemany):
+        counter[sql.split(None, 1)[0].upper()] += 1
+
+    @event.listens_for(engine, 'begin')
+    def begin(conn):
+        counter['BEGIN'] += 1
+
+    @event.listens_for(engine, 'commit')
+    def commit(conn):
+        counter['COMMIT'] += 1
+
+    @event.listens_for(engine, 'rollback')
+    def rollback(conn):
+        counter['ROLLBACK'] += 1
+
+async def _login(username: str, password: str, logins: int, counter: Counter) -> float:
+    counter.clear()
+    started = time.perf_counter()
+    for _ in range(logins):
+        async with db_helper.session_factory() as session:
+            tokens = await UserService(session, TokenService()).authenticate_user(username, password)
+            assert tokens, 'login failed'
+    return time.perf_counter() - started
+
+def _report(title: str, counter: Counter, logins: int, elapsed: float) -> None:
+    total = sum(counter.values())
+    detail = ', '.join(f"{kind} {count / logins:g}" for kind, count in sorted(counter.items()))
+    print(f"{title:14}{total / logins:6.2f} round trips/login ({detail}), {elapsed / logins * 1000:.1f} ms/login")
+
+async def run(logins: int) -> None:
+    username, password = f"bench_{token_hex(4)}", token_hex(8)
+    async with db_helper.session_factory() as session:
+        user = UserModel(username=username, password=await hash_executor.hash_password(password))
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+
+    counter: Counter = Counter()
+    _count(counter)
+    try:
+        _report('login', counter, logins, await _login(username, password, logins, counter))
+    finally:
+        async with db_helper.session_factory() as session:
+            await session.execute(delete(RefreshTokenModel).where(RefreshTokenModel.user_id == user_id))
+            await session.execute(delete(UserModel).where(UserModel.id == user_id))
+            await session.commit()
+        await user_cache.invalidate(user_id)
+        hash_executor.shutdown()
+        await db_helper.dispose()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.logins))
@@ -0,0 +1,118 @@
+"""
+ORM vs raw asyncpg for the hot auth queries.
+
+Creates a throwaway user in the configured database and times, per backend,
+user-by-id and user-by-username (user cache off and password check skipped, so only
+the query is measured), refresh token insert and refresh token lookup. Each operation runs in its own
+transaction, like a request. Both backends are imported directly, whatever
+settings.db.repository says. The user and its tokens are removed afterwards.
+
+    python -m scripts.benchmarks.orm_vs_asyncpg --iterations 2000
+"""
+from sqlalchemy import delete
+from datetime import datetime, timedelta, timezone
+from secrets import token_hex, token_urlsafe
+from statistics import median
+from types import ModuleType
+import argparse
+import asyncio
+import time
+
+from src.core.config.auth_config import token_digest
+from src.core.dependencies.db_helper import db_helper
+from src.core.schemas.pydantic_schemas.auth_schema import RefreshToken
+from src.core.services.auth.hash_executor import hash_executor
+from src.core.services.cache.user_cache import user_cache
+from src.core.services.database.postgres.models.refresh_token import RefreshTokenModel
+from src.core.services.database.postgres.models.user import UserModel
+from src.core.services.database.postgres.orm import token_crud, user_orm
+from src.core.services.database.postgres.raw import token_raw, user_raw
+
+
+BACKENDS = {
+    'orm': (user_orm, token_crud),
+    'asyncpg': (user_raw, token_raw),
+}
+
+
+async def _time(iterations: int, operation) -> list[float]:
+    timings = []
+    for number in range(iterations):
+        async with db_helper.session_factory() as session:
+            started = time.perf_counter()
+            await operation(session, number)
+            await session.commit()
+            timings.append(time.perf_counter() - started)
+    return timings
+
+def _report(backend: str, operation: str, timings: list[float]) -> None:
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(
+        f"{backend:8}{operation:16}{len(timings) / sum(timings):9.0f} ops/s  "
+        f"p50 {median(timings) * 1e6:7.0f} us  p99 {p99 * 1e6:7.0f} us"
+    )
+
+async def _bench(backend: str, users: ModuleType, tokens: ModuleType, user: dict, iterations: int) -> None:
+    raw_tokens: list[str] = []
+
+    def token_data(number: int) -> RefreshToken:
+        raw_tokens.append(f"{backend}-{number}-{token_hex(8)}")
+        return RefreshToken(
+            user_id=user['id'],
+            token=token_digest(raw_tokens[-1]),
+            expires_at=datetime.now(timezone.utc) + timedelta(days=1),
+            family_id=token_urlsafe(16)
+        )
+
+    async def by_id(session, number):
+        assert await users.select_data_user_id(session, user['id']) is not None
+
+    async def by_username(session, number):
+        assert await users.verify_user_credentials(session, user['username'], 'wrong') == (None, None)
+
+    async def insert(session, number):
+        await tokens.add_refresh_token(session, token_data(number))
+
+    async def lookup(session, number):
+        assert await tokens.select_refresh_token(session, raw_tokens[number % len(raw_tokens)]) is not None
+
+    for name, operation in (('user by id', by_id), ('user by name', by_username), ('token insert', insert), ('token lookup', lookup)):
+        await _time(min(50, iterations), operation)  # warm up the statement caches
+        _report(backend, name, await _time(iterations, operation))
+
+async def run(iterations: int) -> None:
+    username = f"bench_{token_hex(4)}"
+    async with db_helper.session_factory() as session:
+        user = UserModel(username=username, password=await hash_executor.hash_password(token_hex(8)))
+        session.add(user)
+        await session.commit()
+        user = {'id': user.id, 'username': username}
+
+    async def rejected(password, password_hash):
+        return False, None
+
+    # Cache off so every call reaches the database; the password hash check is the same
+    # for both backends and would drown the query cost, so it is skipped
+    enabled, verify = user_cache.enabled, hash_executor.verify_and_update_password
+    user_cache.enabled = False
+    hash_executor.verify_and_update_password = rejected
+    try:
+        for backend, (users, tokens) in BACKENDS.items():
+            await _bench(backend, users, tokens, user, iterations)
+    finally:
+        user_cache.enabled = enabled
+        hash_executor.verify_and_update_password = verify
+        async with db_helper.session_factory() as session:
+            await session.execute(delete(RefreshTokenModel).where(RefreshTokenModel.user_id == user['id']))
+            await session.execute(delete(UserModel).where(UserModel.id == user['id']))
+            await session.commit()
+        hash_executor.shutdown()
+        await db_helper.dispose()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.iterations))
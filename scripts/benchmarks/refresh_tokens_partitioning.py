@@ -0,0 +1,126 @@
+"""
+Insert, expiry and vacuum cost of refresh_tokens, plain table vs partitioned by expires_at.
+
+Builds two scratch tables shaped like refresh_tokens in the configured database,
+fills them with the same generated dataset, then expires the oldest weeks
+(DELETE on the plain table, DETACH + DROP on the partitioned one) and vacuums both.
+
+    python -m scripts.benchmarks.refresh_tokens_partitioning --rows 1000000 --weeks 8 --expire 2
+"""
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+from sqlalchemy import text
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import time
+
+from src.core.config.config import settings
+
+
+COLUMNS = """
+    id integer NOT NULL,
+    token varchar(255) NOT NULL,
+    jti varchar(36),
+    expires_at timestamp NOT NULL,
+    revoked boolean NOT NULL,
+    replaced_by_token varchar(255),
+    created_at timestamp NOT NULL,
+    family_id varchar(36) NOT NULL,
+    device_info varchar(200),
+    previous_token_id integer,
+    user_id integer NOT NULL
+"""
+PLAIN = 'bench_refresh_tokens_plain'
+PARTITIONED = 'bench_refresh_tokens_partitioned'
+
+
+def _generate(table: str, rows: int, start: datetime, weeks: int) -> str:
+    return (
+        f"INSERT INTO {table} "
+        f"SELECT g, md5(g::text), gen_random_uuid()::text, "
+        f"'{start.isoformat(sep=' ')}'::timestamp + (g % {weeks * 7 * 24}) * interval '1 hour', "
+        f"g % 10 = 0, NULL, now(), md5((g / 4)::text), 'bench', NULLIF(g - 1, 0), g % 10000 "
+        f"FROM generate_series(1, {rows}) AS g"
+    )
+
+async def _timed(engine: AsyncEngine, *statements: str) -> float:
+    async with engine.connect() as conn:
+        started = time.perf_counter()
+        for statement in statements:
+            await conn.execute(text(statement))
+        return time.perf_counter() - started
+
+async def _size(engine: AsyncEngine, table: str) -> str:
+    async with engine.connect() as conn:
+        return (await conn.execute(text(
+            "SELECT pg_size_pretty(sum(pg_total_relation_size(relid))) "
+            f"FROM pg_partition_tree('{table}')"
+        ))).scalar_one()
+
+async def run(rows: int, weeks: int, expire: int) -> None:
+    engine = create_async_engine(settings.db.give_url, isolation_level='AUTOCOMMIT')
+    start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start -= timedelta(days=start.weekday())
+    cutoff = start + timedelta(weeks=expire)
+    results: dict[str, dict[str, float]] = {PLAIN: {}, PARTITIONED: {}}
+
+    try:
+        await _timed(engine, f"DROP TABLE IF EXISTS {PLAIN}", f"DROP TABLE IF EXISTS {PARTITIONED}")
+        partitions = [
+            f"CREATE TABLE {PARTITIONED}_{week} PARTITION OF {PARTITIONED} FOR VALUES "
+            f"FROM ('{(start + timedelta(weeks=week)).isoformat(sep=' ')}') "
+            f"TO ('{(start + timedelta(weeks=week + 1)).isoformat(sep=' ')}')"
+            for week in range(weeks)
+        ]
+        await _timed(
+            engine,
+            f"CREATE TABLE {PLAIN} ({COLUMNS}, PRIMARY KEY (id))",
+            f"CREATE TABLE {PARTITIONED} ({COLUMNS}, PRIMARY KEY (id, expires_at)) PARTITION BY RANGE (expires_at)",
+            *partitions
+        )
+        for table in (PLAIN, PARTITIONED):
+            await _timed(
+                engine,
+                f"CREATE INDEX ON {table} (token)",
+                f"CREATE INDEX ON {table} (family_id)",
+                f"CREATE INDEX ON {table} (expires_at)"
+            )
+            results[table]['insert'] = await _timed(engine, _generate(table, rows, start, weeks))
+            results[table]['vacuum (fresh)'] = await _timed(engine, f"VACUUM {table}")
+
+        results[PLAIN]['expire'] = await _timed(
+            engine, f"DELETE FROM {PLAIN} WHERE expires_at < '{cutoff.isoformat(sep=' ')}'"
+        )
+        results[PARTITIONED]['expire'] = await _timed(engine, *(
+            statement
+            for week in range(expire)
+            for statement in (
+                f"ALTER TABLE {PARTITIONED} DETACH PARTITION {PARTITIONED}_{week}",
+                f"DROP TABLE {PARTITIONED}_{week}"
+            )
+        ))
+        for table in (PLAIN, PARTITIONED):
+            results[table]['vacuum (after expiry)'] = await _timed(engine, f"VACUUM {table}")
+            results[table]['size'] = await _size(engine, table)
+
+        print(f"{rows} rows over {weeks} weeks, expiring the oldest {expire}")
+        print(f"{'':24}{'plain':>14}{'partitioned':>14}")
+        for metric in results[PLAIN]:
+            plain, partitioned = results[PLAIN][metric], results[PARTITIONED][metric]
+            if isinstance(plain, float):
+                print(f"{metric:24}{plain:>13.3f}s{partitioned:>13.3f}s")
+            else:
+                print(f"{metric:24}{plain:>14}{partitioned:>14}")
+
+    finally:
+        await _timed(engine, f"DROP TABLE IF EXISTS {PLAIN}", f"DROP TABLE IF EXISTS {PARTITIONED}")
+        await engine.dispose()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--weeks', type=int, default=8)
+    parser.add_argument('--expire', type=int, default=2, help='oldest weeks to expire')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.rows, args.weeks, args.expire))
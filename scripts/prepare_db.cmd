@@ -4,7 +4,6 @@ set DB_HOST=localhost
 
 :: Run migrations
 echo Running database migrations...
-alembic revision --autogenerate -m "init"
 alembic upgrade head
 
 :: Start Docker
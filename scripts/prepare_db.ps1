@@ -3,7 +3,6 @@ $env:DB_HOST = "localhost"
 
 # Run migrations
 Write-Host "Running database migrations..."
-alembic revision --autogenerate -m "init"
 alembic upgrade head
 
 # Start Docker
@@ -5,7 +5,6 @@ export DB_HOST=localhost
 
 # Run migrations
 echo "Running database migrations..."
-alembic revision --autogenerate -m "init" && \
 alembic upgrade head
 
 # Start Docker with original environment
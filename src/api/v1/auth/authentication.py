@@ -11,6 +11,8 @@ from src.core.schemas.pydantic_schemas.user import UserSchema
 from src.core.config.config import templates, settings
 from src.core.utils.prepared_templates import prepare_template
 from src.core.dependencies.db_helper import DBDI
+from src.core.dependencies.rate_limit import rate_limit
+from src.core.dependencies.metrics import timed
 from src.core.menu.urls import choice_from_menu, menu_items
 from src.core.dependencies.auth_deps import GET_TOKEN_SERVICE, GET_CURRENT_ACTIVE_USER, GET_AUTH_SERVICE, GET_CURRENT_USER
 from src.core.config.auth_config import (
@@ -49,7 +51,7 @@ async def html_login(
     return response
 
 
-@router.post("/login/process")
+@router.post("/login/process", dependencies=[rate_limit('login')])
 async def login(
     request: Request,
     form_data: form_scheme,
@@ -61,19 +63,23 @@ async def login(
             password=form_data.password
         )
         
+        # Every outcome times its response construction, so the render phase is always comparable
         if not tokens:
-            return await html_login(request=request, error='Invalid credentials')
+            with timed('login', 'render'):
+                return await html_login(request=request, error='Invalid credentials')
         
-        response = RedirectResponse(url='/', status_code=302)
-        await auth_service.token_service.set_secure_cookies(
-            response=response,
-            tokens=tokens
-        )
+        with timed('login', 'render'):
+            response = RedirectResponse(url='/', status_code=302)
+            await auth_service.token_service.set_secure_cookies(
+                response=response,
+                tokens=tokens
+            )
         return response
         
     except Exception as err:
         logger.error(f"Login failed: {err}")
-        return await html_login(request=request, error='Login failed')
+        with timed('login', 'render'):
+            return await html_login(request=request, error='Login failed')
 
 @router.get("/register")
 async def html_register(
@@ -97,7 +103,7 @@ async def html_register(
     response = templates.TemplateResponse('users/register.html', template_response_body_data)
     return response
 
-@router.post("/register/process")
+@router.post("/register/process", dependencies=[rate_limit('register')])
 async def register(
     request:Request,
     auth_service: GET_AUTH_SERVICE,
@@ -164,7 +170,7 @@ async def logout(
     return response
 
 
-@router.post("/refresh")
+@router.post("/refresh", dependencies=[rate_limit('refresh')])
 async def refresh_tokens(
     request: Request,
     session: DBDI,
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Form
+import logging
+
+from src.core.config.config import settings
+from src.core.dependencies.db_helper import DBDI_READ
+from src.core.dependencies.auth_deps import GET_TOKEN_SERVICE, GET_CURRENT_SUPERUSER
+from src.core.dependencies.rate_limit import rate_limit
+from src.core.schemas.pydantic_schemas.auth_schema import (
+    IntrospectionRequest,
+    IntrospectionResponse,
+    IntrospectionResult
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix=settings.prefix.api_data.prefix, tags=['auth'])
+
+
+# RFC 7662 2.1: the caller must be authorized, otherwise the endpoint is a token scanning oracle
+@router.post(
+    "/introspect",
+    response_model=IntrospectionResult,
+    response_model_exclude_none=True,
+    dependencies=[rate_limit('introspect')]
+)
+async def introspect(
+    caller: GET_CURRENT_SUPERUSER,
+    session: DBDI_READ,
+    token_service: GET_TOKEN_SERVICE,
+    token: str = Form(...),
+    token_type_hint: str | None = Form(None)
+):
+    """Single token introspection as defined by RFC 7662 (form encoded)"""
+    results = await token_service.introspect_tokens(session, [token])
+    return results[0]
+
+
+@router.post(
+    "/introspect/batch",
+    response_model=IntrospectionResponse,
+    response_model_exclude_none=True,
+    dependencies=[rate_limit('introspect_batch')]
+)
+async def introspect_batch(
+    caller: GET_CURRENT_SUPERUSER,
+    data: IntrospectionRequest,
+    session: DBDI_READ,
+    token_service: GET_TOKEN_SERVICE
+):
+    """Introspect many tokens in one call, results follow the request order"""
+    logger.debug(f"Introspecting {len(data.tokens)} tokens for {caller.username}")
+    results = await token_service.introspect_tokens(session, data.tokens)
+    return {"results": results}
@@ -1,14 +1,51 @@
 from fastapi import APIRouter
 import logging
 
-from src.core.dependencies.db_helper import DBDI
+from src.core.dependencies.db_helper import db_helper, occupancy_stats
+from src.core.services.auth.hash_executor import hash_executor
+from src.core.services.auth.claims_cache import claims_cache
+from src.core.services.cache.user_cache import user_cache
+from src.core.services.auth.revocation_list import revocation_list
+from src.core.services.auth.token_reaper import token_reaper
+from src.core.middleware.profiler import request_profiler
 
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get('/ping')
-async def some_func(db:DBDI):
-    logger.info(f'{db.is_active=}')
+async def some_func():
     logger.info('Everything is fine.')
-    return 'pong'
\ No newline at end of file
+    return 'pong'
+
+@router.get('/ping/hashing')
+async def hashing_stats():
+    return hash_executor.stats()
+
+@router.get('/ping/claims')
+async def claims_cache_stats():
+    return claims_cache.stats()
+
+@router.get('/ping/users_cache')
+async def users_cache_stats():
+    return user_cache.stats()
+
+@router.get('/ping/revocations')
+async def revocation_stats():
+    return revocation_list.stats()
+
+@router.get('/ping/reaper')
+async def reaper_stats():
+    return token_reaper.stats()
+
+@router.get('/ping/db_pool')
+async def db_pool_stats():
+    return db_helper.pool_stats()
+
+@router.get('/ping/db_requests')
+async def db_request_stats():
+    return occupancy_stats()
+
+@router.get('/ping/profiler')
+async def profiler_stats():
+    return request_profiler.stats()
@@ -1,26 +1,65 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
 import logging
 
-from src.core.dependencies.db_helper import DBDI
+from src.core.dependencies.db_helper import DBDI_READ, db_helper
+from src.core.dependencies.auth_deps import GET_AUTH_SERVICE, GET_TOKEN_SERVICE, GET_CURRENT_SUPERUSER
+from src.core.schemas.pydantic_schemas.user import UserPage
 from src.core.services.auth.user_service import UserService
+from src.core.services.database.postgres.models.user import USER_PUBLIC_FIELDS
 
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-@router.get('/all_users')
+EXPORT_MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _fields(fields: Optional[str]) -> tuple[str, ...]:
+    if not fields:
+        return USER_PUBLIC_FIELDS
+    requested = tuple(field.strip() for field in fields.split(',') if field.strip())
+    unknown = set(requested) - set(USER_PUBLIC_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return requested
+
+@router.get('/all_users', response_model=UserPage)
 async def get_all_users(
-    session:DBDI
+    admin: GET_CURRENT_SUPERUSER,
+    session: DBDI_READ,
+    token_service: GET_TOKEN_SERVICE,
+    after: Optional[int] = Query(None, description="next_after of the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="comma separated, id is always included")
     ):
-    user = UserService(session=session)
-    data = await user.get_all_users()
-    return data
+    user = UserService(session=session, token_service=token_service)
+    return await user.list_users(after, limit, _fields(fields))
+
+@router.get('/all_users/export')
+async def export_all_users(
+    admin: GET_CURRENT_SUPERUSER,
+    format: str = Query('ndjson', pattern='^(ndjson|csv)$'),
+    fields: Optional[str] = Query(None, description="comma separated, id is always included")
+    ):
+    logger.info(f"User export ({format}) started by {admin.username}")
+    return StreamingResponse(
+        UserService.export_users(db_helper.read_session, _fields(fields), format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'}
+    )
 
 @router.delete('/all_users')
 async def del_all_users(
-    session:DBDI
+    admin: GET_CURRENT_SUPERUSER,
+    user: GET_AUTH_SERVICE
 ):
-    user = UserService(session=session)
-
     data = await user.delete_all_users()
-    return data
\ No newline at end of file
+    return data
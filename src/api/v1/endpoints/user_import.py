@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form
+from typing import Optional
+import logging
+import io
+
+from src.core.dependencies.auth_deps import GET_CURRENT_SUPERUSER
+from src.core.schemas.pydantic_schemas.user import UserImportReport
+from src.core.services.auth.user_import import user_importer, read_rows
+
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=['users'])
+
+
+@router.post('/users/import', response_model=UserImportReport)
+async def import_users(
+    user: GET_CURRENT_SUPERUSER,
+    file: UploadFile = File(...),
+    format: Optional[str] = Form(None)
+):
+    """Bulk import from a CSV or NDJSON upload (superusers only), duplicates and invalid rows are reported"""
+    fmt = format or ('csv' if (file.filename or '').lower().endswith('.csv') else 'ndjson')
+    if fmt not in ('csv', 'ndjson'):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Format must be csv or ndjson")
+
+    logger.info(f"User import of {file.filename} ({fmt}) started by {user.username}")
+    stream = io.TextIOWrapper(file.file, encoding='utf-8', newline='')
+    return await user_importer.import_rows(read_rows(stream, fmt))
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import JSONResponse
+import logging
+
+from src.core.config.config import settings
+from src.core.services.auth.keyring import keyring
+
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix='/.well-known', tags=['well-known'])
+
+@router.get('/jwks.json')
+async def jwks(request: Request):
+    headers = {
+        "Cache-Control": f"public, max-age={settings.jwt.jwks_max_age}",
+        "ETag": keyring.jwks_etag
+    }
+    if request.headers.get("if-none-match") == keyring.jwks_etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=keyring.jwks, headers=headers)
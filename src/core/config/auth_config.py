@@ -3,13 +3,34 @@ from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from authlib.integrations.starlette_client import OAuth
 from typing import Any, Dict, Annotated
+import hashlib
+import hmac
 
 from src.core.config.config import settings
+from src.core.config.models import HashingConfig
 
 
 oauth = OAuth()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def build_pwd_context(hashing: HashingConfig) -> CryptContext:
+    """Single hashing policy: the configured scheme hashes, any other known scheme or cost is rehashed on login"""
+    schemes = ["bcrypt", "argon2"]
+    schemes.sort(key=lambda scheme: scheme != hashing.scheme)
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__default_rounds=hashing.bcrypt_rounds,
+        bcrypt__min_rounds=hashing.bcrypt_rounds,
+        bcrypt__max_rounds=hashing.bcrypt_rounds,
+        argon2__type="ID",
+        argon2__default_rounds=hashing.argon2_time_cost,
+        argon2__min_rounds=hashing.argon2_time_cost,
+        argon2__max_rounds=hashing.argon2_time_cost,
+        argon2__memory_cost=hashing.argon2_memory_cost,
+        argon2__parallelism=hashing.argon2_parallelism,
+    )
+
+pwd_context = build_pwd_context(settings.hashing)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 form_scheme = Annotated[OAuth2PasswordRequestForm, Depends(OAuth2PasswordRequestForm)]
 
@@ -20,6 +41,13 @@ ACCESS_TYPE = 'access'
 REFRESH_TYPE = 'refresh'
 CSRF_TYPE = 'csrf'
 
+# Refresh tokens stored before the switch to keyed digests were bcrypt hashes
+LEGACY_TOKEN_PREFIX = '$2'
+
+def token_digest(token: str) -> str:
+    """Deterministic keyed digest of a raw token, used as its indexed lookup key"""
+    return hmac.new(SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
+
 class AuthException(HTTPException):
     def __init__(
         self,
@@ -8,7 +8,15 @@ from src.core.config.models import (
     Mode, 
     DatabaseConfig, 
     RedisSettings, 
+    UserCacheConfig,
+    RevocationConfig,
+    RateLimitConfig,
+    ReaperConfig,
+    TokenPartitionConfig,
+    MetricsConfig,
+    ProfilingConfig,
     JwtConfig,
+    HashingConfig,
     FacebookClient,
     GithubClient,
     StackoverflowClient
@@ -34,7 +42,15 @@ class Settings(BaseSettings):
     # Services
     db: DatabaseConfig
     redis: RedisSettings = RedisSettings()
+    user_cache: UserCacheConfig = UserCacheConfig()
+    revocation: RevocationConfig = RevocationConfig()
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    reaper: ReaperConfig = ReaperConfig()
+    token_partitions: TokenPartitionConfig = TokenPartitionConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    profiling: ProfilingConfig = ProfilingConfig()
     jwt:JwtConfig
+    hashing:HashingConfig = HashingConfig()
     #elastic:ElasticSearch = ElasticSearch()
     #email:Email_Settings = Email_Settings()
 
@@ -1,13 +1,17 @@
 from pydantic import BaseModel, field_validator
 from typing import Optional
+from pathlib import Path
+from datetime import datetime
 
 class RunConfig(BaseModel):
     """
     host:str default - 127.0.0.1
     port:int default - 8000
+    workers:int default - 1, processes serving the app, they share the database connection budget
     """
     host:str = '127.0.0.1'
     port:int = 8000
+    workers:int = 1
 
 class ApiPrefix_V1(BaseModel):
     """
@@ -34,24 +38,208 @@ class RedisSettings(BaseModel):
     host:str = 'localhost'
     port:int = 6379
     db:int = 0
+    socket_timeout:float = 0.25
+    retries:int = 1
+
+class UserCacheConfig(BaseModel):
+    """
+    enabled:bool default - True
+    l1_size:int default - 10000 users kept in process
+    l1_ttl:int default - 5 seconds, bounds staleness across workers
+    l2_ttl:int default - 300 seconds in Redis
+    """
+    enabled:bool = True
+    l1_size:int = 10000
+    l1_ttl:int = 5
+    l2_ttl:int = 300
+
+class RevocationConfig(BaseModel):
+    """
+    bloom_capacity:int default - 100000 revoked ids before the false positive rate degrades
+    bloom_error_rate:float default - 0.01
+    rebuild_interval:int default - 300 seconds between full Bloom filter rebuilds
+    """
+    bloom_capacity:int = 100000
+    bloom_error_rate:float = 0.01
+    rebuild_interval:int = 300
+
+class ReaperConfig(BaseModel):
+    """
+    enabled:bool default - True, run the expired token reaper (partition maintenance) inside the app
+    interval:int default - 300 seconds between passes
+    batch_size:int default - 1000 rows per delete transaction (default partition sweep and purge)
+    pause:float default - 0.1 seconds between batches
+    """
+    enabled:bool = True
+    interval:int = 300
+    batch_size:int = 1000
+    pause:float = 0.1
+
+class TokenPartitionConfig(BaseModel):
+    """
+    interval:str default - week, range of one refresh_tokens partition (day or week)
+    premake:int default - 4, partitions kept ahead of the refresh token lifetime
+    lock_timeout_ms:int default - 2000, give up ATTACH/DETACH instead of queueing behind long transactions
+    """
+    interval:str = 'week'
+    premake:int = 4
+    lock_timeout_ms:int = 2000
+
+    @field_validator('interval')
+    def validate_interval(cls, v):
+        if v not in ('day', 'week'):
+            raise ValueError("Interval must be day or week")
+        return v
+
+class MetricsConfig(BaseModel):
+    """
+    enabled:bool default - True, serve Prometheus metrics at /metrics
+    multiproc_dir:str default - '', shared directory for several workers (PROMETHEUS_MULTIPROC_DIR),
+        emptied by `python main.py` or `python -m src.core.dependencies.metrics` before the server starts
+    """
+    enabled:bool = True
+    multiproc_dir:str = ''
+
+class ProfilingConfig(BaseModel):
+    """
+    server_timing:bool default - False, add a Server-Timing header (db, hash, sign, verify, render, total)
+    sample_rate:float default - 0.0, fraction of requests profiled with cProfile and tracemalloc
+    slow_ms:float default - 0, dump the sampled stacks of requests slower than this (0 - off)
+    sampler_interval_ms:float default - 5, stack sampling period of the event loop thread
+    sampler_window:int default - 60 seconds of stack samples kept in memory
+    directory:str default - profiles, where the dumps are written
+    """
+    server_timing:bool = False
+    sample_rate:float = 0.0
+    slow_ms:float = 0
+    sampler_interval_ms:float = 5
+    sampler_window:int = 60
+    directory:str = 'profiles'
+
+    @property
+    def enabled(self) -> bool:
+        return self.server_timing or self.sample_rate > 0 or self.slow_ms > 0
+
+class RateLimitRule(BaseModel):
+    """
+    limit:int - requests allowed in the window
+    window:int default - 60 seconds
+    """
+    limit:int
+    window:int = 60
+
+class RouteRateLimit(BaseModel):
+    """
+    per_ip:RateLimitRule|None - keyed by client address
+    per_username:RateLimitRule|None - keyed by the submitted username
+    total:RateLimitRule|None - one bucket for the whole route
+    """
+    per_ip:Optional[RateLimitRule] = None
+    per_username:Optional[RateLimitRule] = None
+    total:Optional[RateLimitRule] = None
+
+class RateLimitConfig(BaseModel):
+    """
+    enabled:bool default - True
+    routes:dict[str, RouteRateLimit] - limits by route scope (login, register, refresh, introspect, introspect_batch)
+    """
+    enabled:bool = True
+    routes:dict[str, RouteRateLimit] = {
+        'login': RouteRateLimit(
+            per_ip=RateLimitRule(limit=20),
+            per_username=RateLimitRule(limit=5),
+            total=RateLimitRule(limit=1000)
+        ),
+        'register': RouteRateLimit(
+            per_ip=RateLimitRule(limit=5, window=3600),
+            total=RateLimitRule(limit=200)
+        ),
+        'refresh': RouteRateLimit(
+            per_ip=RateLimitRule(limit=60),
+            total=RateLimitRule(limit=5000)
+        ),
+        'introspect': RouteRateLimit(
+            per_ip=RateLimitRule(limit=120),
+            total=RateLimitRule(limit=5000)
+        ),
+        # Up to 1000 tokens per call
+        'introspect_batch': RouteRateLimit(
+            per_ip=RateLimitRule(limit=10),
+            total=RateLimitRule(limit=200)
+        ),
+    }
 
 class CurrentDB(BaseModel):
     database:str = 'postgres'
 
 class DatabaseConfig(BaseModel): 
+    """
+    replicas:list[str] default - [], read replicas as full URLs or host[:port] sharing the primary's credentials
+    pool_sizing:str default - fixed, fixed uses pool_size/max_overflow, budget derives them from max_connections
+    max_connections:int default - 100, Postgres max_connections (per server) when sizing by budget
+    reserved_connections:int default - 10, kept free for superusers, migrations and tooling
+    pool_timeout:float default - 30 seconds to wait for a connection
+    pool_pre_ping:bool default - False, test connections on checkout
+    pool_recycle:int default - -1, replace connections older than this many seconds (-1 never)
+    repository:str default - orm, backend of the hot auth queries, orm or asyncpg (prepared statements, plain records)
+    """
     echo: bool = True
     echo_pool: bool = False
     pool_size: int = 5
     max_overflow: int = 10
+    pool_sizing: str = 'fixed'
+    max_connections: int = 100
+    reserved_connections: int = 10
+    pool_timeout: float = 30
+    pool_pre_ping: bool = False
+    pool_recycle: int = -1
+    repository: str = 'orm'
 
     name: str
     user: str
     password: str
     host: str = 'localhost'
     port: int = 5432
+    replicas: list[str] = []
 
     database:CurrentDB = CurrentDB()
 
+    @field_validator('pool_sizing')
+    def validate_pool_sizing(cls, v):
+        if v not in ('fixed', 'budget'):
+            raise ValueError("Pool sizing must be fixed or budget")
+        return v
+
+    @field_validator('repository')
+    def validate_repository(cls, v):
+        if v not in ('orm', 'asyncpg'):
+            raise ValueError("Repository must be orm or asyncpg")
+        return v
+
+    def pool_limits(self, workers: int) -> tuple[int, int]:
+        """
+        (pool_size, max_overflow) of one engine in one process. With budget sizing every
+        worker gets an equal share of max_connections - reserved_connections, half of it
+        kept open and half as overflow.
+        """
+        if self.pool_sizing == 'fixed':
+            return self.pool_size, self.max_overflow
+        share = max(1, (self.max_connections - self.reserved_connections) // max(1, workers))
+        pool_size = max(1, share // 2)
+        return pool_size, max(0, share - pool_size)
+
+    @property
+    def replica_urls(self) -> list[str]:
+        primary = self.give_url
+        urls = []
+        for replica in self.replicas:
+            if '://' in replica:
+                urls.append(replica)
+                continue
+            host, _, port = replica.partition(':')
+            urls.append(primary.replace(f"@{self.host}:{self.port}/", f"@{host}:{port or self.port}/", 1))
+        return urls
+
     @property
     def give_url(self):
         current_db = self.database.database.lower() 
@@ -71,11 +259,84 @@ class DatabaseConfig(BaseModel):
         # Default case if database type is not recognized
         raise ValueError(f"Unsupported database type: {current_db}")
 
+class HashingConfig(BaseModel):
+    """
+    executor:str default - thread (thread or process)
+    max_workers:int default - 4
+    import_workers:int default - 2, separate pool for bulk imports so they never queue ahead of logins
+    scheme:str default - bcrypt (bcrypt or argon2), hashes of the other scheme are upgraded on login
+    bcrypt_rounds:int default - 12
+    argon2_time_cost:int default - 3
+    argon2_memory_cost:int default - 65536 KiB
+    argon2_parallelism:int default - 4
+    """
+    executor:str = 'thread'
+    max_workers:int = 4
+    import_workers:int = 2
+    scheme:str = 'bcrypt'
+    bcrypt_rounds:int = 12
+    argon2_time_cost:int = 3
+    argon2_memory_cost:int = 65536
+    argon2_parallelism:int = 4
+
+    @field_validator('executor')
+    def validate_executor(cls, v):
+        if v not in ('thread', 'process'):
+            raise ValueError("Executor must be thread or process")
+        return v
+
+    @field_validator('scheme')
+    def validate_scheme(cls, v):
+        if v not in ('bcrypt', 'argon2'):
+            raise ValueError("Scheme must be bcrypt or argon2")
+        return v
+
+class JwtKey(BaseModel):
+    """
+    kid:str - key id published in the token header and JWKS
+    private_key:str|None - PEM or path to PEM, only the signing key needs it
+    public_key:str|None - PEM or path to PEM, derived from private_key if omitted
+    """
+    kid:str
+    private_key:Optional[str] = None
+    public_key:Optional[str] = None
+
+    @staticmethod
+    def _load_pem(value:Optional[str]) -> Optional[str]:
+        if value is None or value.lstrip().startswith('-----BEGIN'):
+            return value
+        return Path(value).read_text()
+
+    @property
+    def private_pem(self) -> Optional[str]:
+        return self._load_pem(self.private_key)
+
+    @property
+    def public_pem(self) -> Optional[str]:
+        return self._load_pem(self.public_key)
+
 class JwtConfig(BaseModel):
+    """
+    key:str - HMAC secret for HS* algorithms and token digests
+    algorithm:str default - HS256 (RS*/ES* sign with keys[signing_kid])
+    keys:list[JwtKey] - every key still accepted for verification
+    signing_kid:str|None - kid used to sign new tokens, first private key if omitted
+    jwks_max_age:int default - 300 seconds of Cache-Control on the JWKS route
+    token_version_ttl:int default - 30 seconds a cached user token_version is trusted
+    legacy_token_fallback_until:datetime|None default - None, until when refresh tokens stored as
+        bcrypt hashes (before digests) are still matched; None disables the fallback
+    """
     key:str
     algorithm:str = 'HS256'
     ACCESS_TOKEN_EXPIRE_MINUTES:int = 30
     REFRESH_TOKEN_EXPIRE_DAYS:int = 7
+    claims_cache_size:int = 4096
+    keys:list[JwtKey] = []
+    signing_kid:Optional[str] = None
+    jwks_max_age:int = 300
+    token_version_ttl:int = 30
+    token_version_cache_size:int = 65536
+    legacy_token_fallback_until:Optional[datetime] = None
 
 class BaseClient(BaseModel):
     client_id: str  # More standard naming than just 'id'
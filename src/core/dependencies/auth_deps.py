@@ -1,16 +1,20 @@
-from fastapi import Depends
-from jose import JWTError, jwt
+from fastapi import Depends, HTTPException, status
 from typing import Annotated
 
 from src.core.services.auth.token_service import TokenService
 from src.core.services.auth.user_service import UserService
-from src.core.dependencies.db_helper import DBDI
+from src.core.dependencies.db_helper import DBDI, DBDI_READ
+from src.core.services.auth.principal import Principal
+from src.core.dependencies.metrics import timed
+from src.core.services.database.postgres.repository import user_repo
+from src.core.services.database.postgres.orm.user_orm import select_user_model
 from src.core.services.database.postgres.models.user import UserModel
 from src.core.config.config import settings
 from src.core.config.auth_config import (
     oauth2_scheme, 
     credentials_exception, 
-    inactive_user_exception
+    inactive_user_exception,
+    ACCESS_TYPE
 )
 
 
@@ -30,33 +34,65 @@ async def get_auth_service(
     )
 
 async def get_current_user(
+    session: DBDI_READ,
     token: str = Depends(oauth2_scheme),
-    auth_service: UserService = Depends(get_auth_service)
-) -> UserModel:
+    token_service: TokenService = Depends(get_token_service)
+) -> Principal:
+    """
+    Authorize from access-token claims, the only DB touch is a cached token_version.
+    Reads go to a replica unless this request already wrote to the primary.
+    """
     if token is None:
         raise credentials_exception
     
-    try:
-        payload = jwt.decode(token, settings.jwt.key, algorithms=[settings.jwt.algorithm])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    with timed('current_user', 'verify'):
+        payload = await token_service.verify_token(token, ACCESS_TYPE)
+    user_id = payload.get("sub")
+    if user_id is None:
         raise credentials_exception
+
+    if "username" not in payload:
+        # Issued before claims were embedded, authorize against the database
+        with timed('current_user', 'db'):
+            principal = await user_repo.select_principal(session, int(user_id))
+        if principal is None:
+            raise credentials_exception
+        return principal
     
-    user = await auth_service.get_user_by_id(int(user_id))
-    if user is None:
+    with timed('current_user', 'db'):
+        outdated = await token_service.is_token_outdated(session, payload)
+    if outdated:
         raise credentials_exception
-    return user
+
+    return Principal.from_claims(payload)
 
 async def get_current_active_user(
-    current_user: UserModel = Depends(get_current_user)
-) -> UserModel:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     if not current_user.is_active:
         raise inactive_user_exception
     return current_user
 
+async def get_current_superuser(
+    current_user: Principal = Depends(get_current_active_user)
+) -> Principal:
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    return current_user
+
+async def get_current_user_model(
+    session: DBDI_READ,
+    current_user: Principal = Depends(get_current_active_user)
+) -> UserModel:
+    """The full UserModel, loaded only by routes that declare this dependency"""
+    user = await select_user_model(session, current_user.id)
+    if user is None:
+        raise credentials_exception
+    return user
+
 GET_TOKEN_SERVICE = Annotated[TokenService, Depends(get_token_service)]
 GET_AUTH_SERVICE = Annotated[UserService, Depends(get_auth_service)]
-GET_CURRENT_USER = Annotated[UserModel, Depends(get_current_user)]
-GET_CURRENT_ACTIVE_USER = Annotated[UserModel, Depends(get_current_active_user)]
\ No newline at end of file
+GET_CURRENT_USER = Annotated[Principal, Depends(get_current_user)]
+GET_CURRENT_ACTIVE_USER = Annotated[Principal, Depends(get_current_active_user)]
+GET_CURRENT_SUPERUSER = Annotated[Principal, Depends(get_current_superuser)]
+GET_CURRENT_USER_MODEL = Annotated[UserModel, Depends(get_current_user_model)]
\ No newline at end of file
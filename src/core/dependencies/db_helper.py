@@ -1,51 +1,200 @@
 from fastapi import Depends
-from typing import AsyncGenerator, Annotated
+from typing import AsyncGenerator, Annotated, Optional
+from sqlalchemy import event, Insert, Update, Delete
+from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncEngine,
     async_sessionmaker,
     AsyncSession,
     )
+import logging
+import random
+import time
 
 from src.core.config.config import settings
+from src.core.dependencies.metrics import (
+    DB_REQUEST_CHECKOUTS,
+    DB_REQUEST_HELD_SECONDS,
+    histogram_snapshot
+)
+from src.core.dependencies.pool_metrics import InstrumentedQueuePool, instrument_pool, pool_stats
+
+
+logger = logging.getLogger(__name__)
+
+
+async def db_request_state() -> AsyncGenerator[dict, None]:
+    """
+    Per-request state shared by DBDI and DBDI_READ (FastAPI resolves it once per request).
+    A plain dict, so SQLAlchemy event hooks running in greenlets can mutate it.
+    Exits after the sessions are closed and records the request's pool occupancy.
+    """
+    state = {"wrote": False, "checkouts": 0, "held": 0.0}
+    yield state
+    if state["checkouts"]:
+        DB_REQUEST_HELD_SECONDS.observe(state["held"])
+        DB_REQUEST_CHECKOUTS.observe(state["checkouts"])
+
+def occupancy_stats() -> dict:
+    """Pool occupancy per request: seconds its sessions held connections and how many transactions took one"""
+    return {
+        "held_seconds": histogram_snapshot(DB_REQUEST_HELD_SECONDS),
+        "checkouts": histogram_snapshot(DB_REQUEST_CHECKOUTS),
+    }
+
+async def commit_and_release(session: AsyncSession) -> None:
+    """
+    Commit the unit of work so far, pending changes included, and hand its connection back
+    to the pool; call before hashing or rendering. A rollback would expire the instances the
+    caller still reads. The session stays usable, the next query checks a connection out again.
+    """
+    if session.in_transaction():
+        await session.commit()
+
+
+class PrimarySession(Session):
+    """Session bound to the primary, records in info['state'] that the request has written"""
+
+
+class RoutingSession(Session):
+    """
+    Read session: queries go to the replica picked for this session until the
+    request has written (through any session), then to the primary so it reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        state = self.info.get('state') or {}
+        replica = self.info.get('replica')
+        if replica is None or self._flushing or state.get('wrote') or isinstance(clause, (Insert, Update, Delete)):
+            return self.info['primary']
+        return replica
+
+
+@event.listens_for(PrimarySession, 'after_flush')
+@event.listens_for(RoutingSession, 'after_flush')
+def _flushed(session, flush_context):
+    if session.info.get('state') is not None:
+        session.info['state']['wrote'] = True
+
+@event.listens_for(PrimarySession, 'after_begin')
+@event.listens_for(RoutingSession, 'after_begin')
+def _began(session, transaction, connection):
+    # A session transaction holds its connection(s) from here until it ends
+    session.info.setdefault('held_since', time.perf_counter())
+
+@event.listens_for(PrimarySession, 'after_transaction_end')
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _ended(session, transaction):
+    if transaction.parent is not None:
+        return
+    held_since = session.info.pop('held_since', None)
+    state = session.info.get('state')
+    if held_since is not None and state is not None:
+        state['held'] += time.perf_counter() - held_since
+        state['checkouts'] += 1
+
+@event.listens_for(PrimarySession, 'do_orm_execute')
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _executed(orm_execute_state):
+    # text() statements can't be classified, only ORM/Core selects count as reads
+    state = orm_execute_state.session.info.get('state')
+    if state is not None and not orm_execute_state.is_select:
+        state['wrote'] = True
 
 
 class DbHelper:
     def __init__(
-            self, 
-            url:str, 
-            echo:bool=True, 
+            self,
+            url:str,
+            echo:bool=True,
             echo_pool:bool=False,
             pool_size:int=5,
-            max_overflow:int=10):
-        
-        self.engine:AsyncEngine = create_async_engine(
-            url=url,
-            echo=echo,
-            echo_pool=echo_pool,
-            pool_size=pool_size,
-            max_overflow=max_overflow
-        )
-        
+            max_overflow:int=10,
+            replica_urls:Optional[list[str]]=None,
+            pool_timeout:float=30,
+            pool_pre_ping:bool=False,
+            pool_recycle:int=-1):
+
+        self.pools:list[tuple[str, AsyncEngine]] = []
+
+        def create_engine(engine_url:str, name:str) -> AsyncEngine:
+            engine = create_async_engine(
+                url=engine_url,
+                echo=echo,
+                echo_pool=echo_pool,
+                poolclass=InstrumentedQueuePool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=pool_timeout,
+                pool_pre_ping=pool_pre_ping,
+                pool_recycle=pool_recycle
+            )
+            instrument_pool(engine.sync_engine.pool, name)
+            self.pools.append((name, engine))
+            return engine
+
+        self.engine:AsyncEngine = create_engine(url, 'primary')
+        self.replica_engines:list[AsyncEngine] = [
+            create_engine(replica_url, 'replica')
+            for replica_url in replica_urls or []
+        ]
+        logger.debug(f"Database pools: size {pool_size}, max overflow {max_overflow}, {len(self.replica_engines)} replicas")
+
         self.session_factory:async_sessionmaker[AsyncSession] = async_sessionmaker(
             bind=self.engine,
+            sync_session_class=PrimarySession,
             autoflush=False,
             expire_on_commit=False,
         )
+        self.read_session_factory:async_sessionmaker[AsyncSession] = async_sessionmaker(
+            sync_session_class=RoutingSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+    def read_session(self, state:Optional[dict]=None) -> AsyncSession:
+        """Replica-routed session, with a state from db_request_state it honours the request's writes"""
+        session = self.read_session_factory()
+        session.info['primary'] = self.engine.sync_engine
+        session.info['replica'] = random.choice(self.replica_engines).sync_engine if self.replica_engines else None
+        session.info['state'] = state
+        return session
+
+    def pool_stats(self) -> list[dict]:
+        pools: dict[str, list] = {}
+        for name, engine in self.pools:
+            pools.setdefault(name, []).append(engine.sync_engine.pool)
+        return [pool_stats(members, name) for name, members in pools.items()]
+
     async def dispose(self) -> None:
         await self.engine.dispose()
-    
-    async def session_getter(self) -> AsyncGenerator[AsyncSession, None]:
+        for replica_engine in self.replica_engines:
+            await replica_engine.dispose()
+
+    async def session_getter(self, state:dict=Depends(db_request_state)) -> AsyncGenerator[AsyncSession, None]:
+        """Lazy: no connection until the first query, each commit or rollback hands it back to the pool"""
         async with self.session_factory() as session:
+            session.info['state'] = state
+            yield session
+
+    async def read_session_getter(self, state:dict=Depends(db_request_state)) -> AsyncGenerator[AsyncSession, None]:
+        async with self.read_session(state) as session:
             yield session
 
 
+pool_size, max_overflow = settings.db.pool_limits(settings.run.workers)
 db_helper = DbHelper(
     url=str(settings.db.give_url),
     echo=settings.db.echo,
     echo_pool=settings.db.echo_pool,
-    pool_size=settings.db.pool_size,
-    max_overflow=settings.db.max_overflow
+    pool_size=pool_size,
+    max_overflow=max_overflow,
+    replica_urls=settings.db.replica_urls,
+    pool_timeout=settings.db.pool_timeout,
+    pool_pre_ping=settings.db.pool_pre_ping,
+    pool_recycle=settings.db.pool_recycle
 )
 DBDI = Annotated[AsyncSession, Depends(db_helper.session_getter)]
-DBDI_WIPING = Annotated[AsyncSession, Depends(db_helper.dispose)]
\ No newline at end of file
+DBDI_READ = Annotated[AsyncSession, Depends(db_helper.read_session_getter)]
+DBDI_WIPING = Annotated[AsyncSession, Depends(db_helper.dispose)]
@@ -0,0 +1,206 @@
+"""
+Prometheus instrumentation. With several workers set metrics.multiproc_dir: every process
+writes its samples there and /metrics sums them, whichever worker serves the scrape.
+
+The directory must start empty. `python main.py` clears it before the workers start; when
+the server is started another way (uvicorn/gunicorn CLI) clear it first:
+
+    python -m src.core.dependencies.metrics
+
+Workers drop their live gauges on shutdown, and the ones of crashed workers on startup.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+import glob
+import logging
+import os
+import re
+import time
+
+from src.core.config.config import settings
+
+# prometheus_client picks its value storage on import, the directory must be known first
+if settings.metrics.multiproc_dir:
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', settings.metrics.multiproc_dir)
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    generate_latest,
+    multiprocess
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds, checkout waits are usually sub-millisecond until the pool runs dry
+CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Seconds a DBAPI connection lives, from connect to close
+LIFETIME_BUCKETS = (1, 10, 60, 300, 900, 1800, 3600, 7200, 21600, 86400)
+# Transactions per request that took a pooled connection
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50)
+# Seconds, from a cached JWT check (~10us) to a slow bcrypt verify or a saturated pool
+PHASE_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+AUTH_PHASE_SECONDS = Histogram(
+    'auth_phase_seconds',
+    'Time spent per phase (db, hash, sign, verify, render) of an auth operation',
+    ('op', 'phase'),
+    buckets=PHASE_BUCKETS
+)
+LOGINS = Counter('auth_logins_total', 'Login attempts by result', ('result',))
+TOKEN_REUSE = Counter('auth_refresh_token_reuse_total', 'Revoked refresh tokens presented again')
+REVOCATIONS = Counter('auth_refresh_tokens_revoked_total', 'Refresh tokens revoked, by scope', ('scope',))
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    'db_pool_checkout_seconds', 'Wait for a pooled connection', ('engine',), buckets=CHECKOUT_BUCKETS
+)
+DB_POOL_HELD_SECONDS = Histogram(
+    'db_pool_held_seconds', 'Time a connection stays checked out', ('engine',), buckets=CHECKOUT_BUCKETS
+)
+DB_POOL_TIMEOUTS = Counter('db_pool_timeouts_total', 'Checkouts that gave up waiting', ('engine',))
+DB_POOL_LIFETIME_SECONDS = Histogram(
+    'db_pool_connection_lifetime_seconds', 'Age of a DBAPI connection when it is closed', ('engine',),
+    buckets=LIFETIME_BUCKETS
+)
+DB_POOL_EVENTS = Counter(
+    'db_pool_connection_events_total', 'DBAPI connections opened, closed and invalidated', ('engine', 'event')
+)
+# Pools are labelled by engine role (primary, replica); gauges move by deltas,
+# so workers (livesum) and the replicas sharing a label add up
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out', 'Connections currently checked out', ('engine',), multiprocess_mode='livesum'
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow', 'Connections open beyond pool_size', ('engine',), multiprocess_mode='livesum'
+)
+DB_POOL_WAIT_SECONDS = Gauge(
+    'db_pool_wait_seconds', 'Wait of the latest checkout', ('engine',), multiprocess_mode='livemostrecent'
+)
+DB_REQUEST_HELD_SECONDS = Histogram(
+    'db_request_held_seconds', 'Seconds the sessions of one request held pooled connections',
+    buckets=CHECKOUT_BUCKETS
+)
+DB_REQUEST_CHECKOUTS = Histogram(
+    'db_request_checkouts', 'Transactions of one request that took a pooled connection',
+    buckets=COUNT_BUCKETS
+)
+
+
+class RequestPhases:
+    """Phase totals of one request for the Server-Timing header, nested timed blocks count once"""
+    __slots__ = ('durations', 'depth')
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+        self.depth = 0
+
+# Set by ServerTimingMiddleware for the duration of a request
+request_phases: ContextVar[Optional[RequestPhases]] = ContextVar('request_phases', default=None)
+
+
+@contextmanager
+def timed(op: str, phase: str) -> Iterator[None]:
+    """Observe the block's wall time as one phase of op, exceptions included"""
+    phases = request_phases.get()
+    if phases is not None:
+        phases.depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        AUTH_PHASE_SECONDS.labels(op, phase).observe(elapsed)
+        if phases is not None:
+            phases.depth -= 1
+            if phases.depth == 0:
+                phases.durations[phase] = phases.durations.get(phase, 0.0) + elapsed
+
+def metric_value(metric, **labels: str) -> float:
+    """This process's value of a counter or gauge child, 0 before it was first touched"""
+    for family in metric.collect():
+        for sample in family.samples:
+            if not sample.name.endswith('_created') and sample.labels == labels:
+                return sample.value
+    return 0.0
+
+def histogram_snapshot(metric: Histogram, **labels: str) -> dict:
+    """Cumulative buckets, sum and count of this process's histogram child"""
+    snapshot = {"buckets": {}, "sum": 0.0, "count": 0.0}
+    for family in metric.collect():
+        for sample in family.samples:
+            sample_labels = {key: value for key, value in sample.labels.items() if key != 'le'}
+            if sample_labels != labels:
+                continue
+            if sample.name.endswith('_bucket'):
+                snapshot["buckets"][sample.labels['le']] = sample.value
+            elif sample.name.endswith('_sum'):
+                snapshot["sum"] = sample.value
+            elif sample.name.endswith('_count'):
+                snapshot["count"] = sample.value
+    return snapshot
+
+def _multiproc_dir() -> Optional[str]:
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+def clear_multiproc_dir() -> None:
+    """Remove every sample file, only before any worker starts (the server's master process)"""
+    directory = _multiproc_dir()
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, '*.db')):
+        os.remove(path)
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def reap_dead_workers() -> list[int]:
+    """
+    Drop the live gauges (livesum, livemostrecent, ...) of workers that died without shutting
+    down, otherwise their last values count forever. Counters and histograms are kept.
+    """
+    directory = _multiproc_dir()
+    if not directory:
+        return []
+    pids = {
+        int(match[1])
+        for path in glob.glob(os.path.join(directory, 'gauge_live*_*.db'))
+        if (match := re.search(r'_(\d+)\.db$', path))
+    }
+    dead = sorted(pid for pid in pids if pid != os.getpid() and not _alive(pid))
+    for pid in dead:
+        multiprocess.mark_process_dead(pid, directory)
+    if dead:
+        logger.info(f"Dropped live gauges of dead workers {dead}")
+    return dead
+
+def mark_worker_dead() -> None:
+    """Call on worker shutdown, its live gauges stop counting"""
+    if _multiproc_dir():
+        multiprocess.mark_process_dead(os.getpid())
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposition of every worker's samples in multiprocess mode, of this process otherwise"""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+if __name__ == '__main__':
+    clear_multiproc_dir()
@@ -0,0 +1,126 @@
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from typing import Optional
+import logging
+import time
+
+from src.core.dependencies.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_EVENTS,
+    DB_POOL_HELD_SECONDS,
+    DB_POOL_LIFETIME_SECONDS,
+    DB_POOL_OVERFLOW,
+    DB_POOL_TIMEOUTS,
+    DB_POOL_WAIT_SECONDS,
+    histogram_snapshot,
+    metric_value
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool timing every checkout, waits included: there is no pool
+    event before a checkout starts, so the wait is measured around _do_get.
+    The overflow gauge is moved here too, once the pool's own counter is settled.
+    """
+    metrics_name: Optional[str] = None
+    _reported_overflow = 0
+
+    def _report_overflow(self) -> None:
+        overflow = max(0, self.overflow())
+        DB_POOL_OVERFLOW.labels(self.metrics_name).inc(overflow - self._reported_overflow)
+        self._reported_overflow = overflow
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics_name is not None:
+                DB_POOL_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        if self.metrics_name is not None:
+            waited = time.perf_counter() - started
+            DB_POOL_CHECKOUT_SECONDS.labels(self.metrics_name).observe(waited)
+            DB_POOL_WAIT_SECONDS.labels(self.metrics_name).set(waited)
+            self._report_overflow()
+        return connection
+
+    def _do_return_conn(self, record):
+        try:
+            super()._do_return_conn(record)
+        finally:
+            if self.metrics_name is not None:
+                self._report_overflow()
+
+    def dispose(self):
+        super().dispose()
+        if self.metrics_name is not None:
+            self._report_overflow()
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool, keep counting into the same series
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def pool_stats(pools: list[Pool], name: str) -> dict:
+    """Configuration of the engine's pools and what this process recorded for them"""
+    return {
+        "engine": name,
+        "pools": len(pools),
+        "size": sum(pool.size() for pool in pools),
+        "max_overflow": sum(getattr(pool, '_max_overflow', 0) for pool in pools),
+        "checked_out": metric_value(DB_POOL_CHECKED_OUT, engine=name),
+        "overflow": metric_value(DB_POOL_OVERFLOW, engine=name),
+        "wait_seconds": metric_value(DB_POOL_WAIT_SECONDS, engine=name),
+        "timeouts": metric_value(DB_POOL_TIMEOUTS, engine=name),
+        "connects": metric_value(DB_POOL_EVENTS, engine=name, event='connect'),
+        "closes": metric_value(DB_POOL_EVENTS, engine=name, event='close'),
+        "invalidations": metric_value(DB_POOL_EVENTS, engine=name, event='invalidate'),
+        "checkout_seconds": histogram_snapshot(DB_POOL_CHECKOUT_SECONDS, engine=name),
+        "held_seconds": histogram_snapshot(DB_POOL_HELD_SECONDS, engine=name),
+        "connection_lifetime_seconds": histogram_snapshot(DB_POOL_LIFETIME_SECONDS, engine=name),
+    }
+
+
+def instrument_pool(pool: Pool, name: str) -> None:
+    """Label the series of an InstrumentedQueuePool with its engine role and hook the lifetime/connect events"""
+    pool.metrics_name = name
+
+    @event.listens_for(pool, 'connect')
+    def connected(dbapi_connection, connection_record):
+        connection_record.info['connected_at'] = time.monotonic()
+        DB_POOL_EVENTS.labels(name, 'connect').inc()
+
+    @event.listens_for(pool, 'checkout')
+    def checked_out(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checked_out_at'] = time.monotonic()
+        DB_POOL_CHECKED_OUT.labels(name).inc()
+
+    @event.listens_for(pool, 'checkin')
+    def checked_in(dbapi_connection, connection_record):
+        # Also fires for invalidated connections, so every checkout is paired with one checkin
+        checked_out_at = connection_record.info.pop('checked_out_at', None) if connection_record else None
+        if checked_out_at is not None:
+            DB_POOL_HELD_SECONDS.labels(name).observe(time.monotonic() - checked_out_at)
+            DB_POOL_CHECKED_OUT.labels(name).dec()
+
+    @event.listens_for(pool, 'close')
+    def closed(dbapi_connection, connection_record):
+        connected_at = connection_record.info.pop('connected_at', None) if connection_record else None
+        if connected_at is not None:
+            DB_POOL_LIFETIME_SECONDS.labels(name).observe(time.monotonic() - connected_at)
+        DB_POOL_EVENTS.labels(name, 'close').inc()
+
+    @event.listens_for(pool, 'invalidate')
+    def invalidated(dbapi_connection, connection_record, exception):
+        DB_POOL_EVENTS.labels(name, 'invalidate').inc()
+        if exception is not None:
+            logger.warning(f"Pool {name} invalidated a connection: {exception}")
@@ -0,0 +1,129 @@
+from fastapi import Depends, HTTPException, Request, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from collections import deque
+import logging
+import math
+import time
+import uuid
+
+from src.core.config.config import settings
+from src.core.config.models import RateLimitRule
+from src.core.dependencies.redis_helper import redis_helper
+
+
+logger = logging.getLogger(__name__)
+
+# Sliding window over sorted sets, one call checks every bucket of a request.
+# KEYS - buckets, ARGV - now_ms, member, then (limit, window_ms) per bucket.
+# The hit is recorded in all buckets only if none of them is full.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local member = ARGV[2]
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[1 + i * 2])
+    local window = tonumber(ARGV[2 + i * 2])
+    redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        retry_after = math.max(retry_after, tonumber(oldest[2]) + window - now)
+    end
+end
+if retry_after > 0 then
+    return retry_after
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, tonumber(ARGV[2 + i * 2]))
+end
+return 0
+"""
+
+
+class RateLimiter:
+    """Sliding-window limiter on Redis with an in-process fallback while Redis is unreachable"""
+
+    def __init__(self, redis: Redis, prefix: str = 'ratelimit', local_max_keys: int = 100000):
+        self.redis = redis
+        self.prefix = prefix
+        self.local_max_keys = local_max_keys
+        self._script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+        self._local: dict[str, deque[float]] = {}
+
+    async def hit(self, buckets: list[tuple[str, RateLimitRule]]) -> float:
+        """Record one request in every bucket, returns 0 or the seconds to wait if any is full"""
+        if not buckets:
+            return 0.0
+        try:
+            return await self._hit_redis(buckets)
+        except (RedisError, OSError) as err:
+            logger.warning(f"Rate limiter falling back to local buckets: {err}")
+            return self._hit_local(buckets)
+
+    async def _hit_redis(self, buckets: list[tuple[str, RateLimitRule]]) -> float:
+        args: list = [int(time.time() * 1000), uuid.uuid4().hex]
+        for _, rule in buckets:
+            args.extend((rule.limit, rule.window * 1000))
+        retry_after_ms = await self._script(
+            keys=[f"{self.prefix}:{key}" for key, _ in buckets],
+            args=args
+        )
+        return int(retry_after_ms) / 1000
+
+    def _hit_local(self, buckets: list[tuple[str, RateLimitRule]]) -> float:
+        now = time.monotonic()
+        if len(self._local) > self.local_max_keys:
+            self._local = {key: hits for key, hits in self._local.items() if hits and hits[-1] > now - 3600}
+
+        retry_after = 0.0
+        windows = []
+        for key, rule in buckets:
+            hits = self._local.setdefault(key, deque())
+            while hits and hits[0] <= now - rule.window:
+                hits.popleft()
+            if len(hits) >= rule.limit:
+                retry_after = max(retry_after, hits[0] + rule.window - now)
+            windows.append(hits)
+
+        if retry_after:
+            return retry_after
+        for hits in windows:
+            hits.append(now)
+        return 0.0
+
+
+rate_limiter = RateLimiter(redis=redis_helper.client)
+
+
+def rate_limit(scope: str):
+    """Route dependency enforcing settings.rate_limit.routes[scope] before the handler runs"""
+
+    async def dependency(request: Request) -> None:
+        route_limit = settings.rate_limit.routes.get(scope)
+        if not settings.rate_limit.enabled or route_limit is None:
+            return
+
+        buckets: list[tuple[str, RateLimitRule]] = []
+        if route_limit.per_ip and request.client:
+            buckets.append((f"{scope}:ip:{request.client.host}", route_limit.per_ip))
+        if route_limit.per_username:
+            username = None
+            if request.headers.get("content-type", "").startswith(
+                ("application/x-www-form-urlencoded", "multipart/form-data")
+            ):
+                username = (await request.form()).get("username")
+            if username:
+                buckets.append((f"{scope}:user:{username}", route_limit.per_username))
+        if route_limit.total:
+            buckets.append((f"{scope}:total", route_limit.total))
+
+        retry_after = await rate_limiter.hit(buckets)
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+    return Depends(dependency)
@@ -0,0 +1,37 @@
+from redis.asyncio import Redis
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+
+from src.core.config.config import settings
+
+
+class RedisHelper:
+    def __init__(
+            self,
+            host:str,
+            port:int=6379,
+            db:int=0,
+            socket_timeout:float=0.25,
+            retries:int=1):
+
+        self.client:Redis = Redis(
+            host=host,
+            port=port,
+            db=db,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout,
+            # Callers fall back locally, so an outage must fail fast instead of backing off
+            retry=Retry(NoBackoff(), retries)
+        )
+
+    async def dispose(self) -> None:
+        await self.client.aclose()
+
+
+redis_helper = RedisHelper(
+    host=settings.redis.host,
+    port=settings.redis.port,
+    db=settings.redis.db,
+    socket_timeout=settings.redis.socket_timeout,
+    retries=settings.redis.retries
+)
@@ -0,0 +1,178 @@
+"""
+Request profiling under real traffic, no debugger attached.
+
+- Sampled requests (profiling.sample_rate) run under cProfile with tracemalloc on and
+  leave <name>.prof (pstats) and <name>.tracemalloc (tracemalloc.Snapshot.load).
+  Both hooks are process-wide, so one request is profiled at a time and the profile
+  covers whatever else the event loop ran meanwhile.
+- Slow requests (profiling.slow_ms) leave <name>.folded: the event loop thread's stacks,
+  sampled every sampler_interval_ms by a daemon thread, over the request's lifetime.
+  Feed it to flamegraph.pl or speedscope.
+"""
+from collections import Counter, deque
+from cProfile import Profile
+from types import FrameType
+from typing import Optional
+import asyncio
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+from src.core.config.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def _folded(frame: Optional[FrameType]) -> str:
+    """Stack as root;...;leaf, the folded format flame graph tools read"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """Daemon thread sampling one thread's stack into a ring buffer of (time, folded stack)"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005, window: float = 60):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: deque[tuple[float, str]] = deque(maxlen=max(1, int(window / interval)))
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples.append((time.perf_counter(), _folded(frame)))
+
+    def between(self, started: float, finished: float) -> Counter:
+        # list() copies the deque in one step, the sampler may append meanwhile
+        return Counter(stack for at, stack in list(self.samples) if started <= at <= finished)
+
+
+class ProfileRun:
+    __slots__ = ('profile', 'tracing')
+
+    def __init__(self, profile: Profile, tracing: bool):
+        self.profile = profile
+        self.tracing = tracing
+
+
+class RequestProfiler:
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: float = 0.0,
+        slow_ms: float = 0,
+        sampler_interval_ms: float = 5,
+        sampler_window: int = 60
+    ):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.sampler_interval = sampler_interval_ms / 1000
+        self.sampler_window = sampler_window
+        self.sampler: Optional[StackSampler] = None
+        self._busy = False
+        self.profiled = 0
+        self.slow = 0
+
+    def start(self) -> Optional[ProfileRun]:
+        """Called on the event loop at request start, a ProfileRun if this request is sampled"""
+        if self.slow_ms and self.sampler is None:
+            self.sampler = StackSampler(threading.get_ident(), self.sampler_interval, self.sampler_window)
+            self.sampler.start()
+
+        if self._busy or not self.sample_rate or random.random() >= self.sample_rate:
+            return None
+        self._busy = True
+        tracing = not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        profile = Profile()
+        try:
+            profile.enable()
+        except ValueError as err:
+            # Another profiler (a debugger, coverage) owns the hook
+            logger.warning(f"Request profiling skipped: {err}")
+            if tracing:
+                tracemalloc.stop()
+            self._busy = False
+            return None
+        return ProfileRun(profile, tracing)
+
+    async def finish(self, run: Optional[ProfileRun], scope: dict, started: float, finished: float) -> None:
+        """Stop a sampled run and write whatever this request left, file I/O off the loop"""
+        snapshot = None
+        if run is not None:
+            run.profile.disable()
+            if run.tracing:
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+            self._busy = False
+
+        elapsed_ms = (finished - started) * 1000
+        stacks = None
+        if self.sampler is not None and elapsed_ms >= self.slow_ms:
+            stacks = self.sampler.between(started, finished)
+        if run is None and not stacks:
+            return
+
+        path = re.sub(r'[^\w.-]+', '_', scope.get('path', '').strip('/')) or 'root'
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{scope.get('method', '')}-{path[:80]}-{elapsed_ms:.0f}ms"
+        try:
+            await asyncio.to_thread(self._write, name, run, snapshot, stacks)
+        except OSError as err:
+            logger.warning(f"Failed to write request profile {name}: {err}")
+            return
+        if run is not None:
+            self.profiled += 1
+        if stacks:
+            self.slow += 1
+
+    def _write(self, name: str, run: Optional[ProfileRun], snapshot: Optional[tracemalloc.Snapshot], stacks: Optional[Counter]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, name)
+        if run is not None:
+            run.profile.dump_stats(f"{base}.prof")
+        if snapshot is not None:
+            snapshot.dump(f"{base}.tracemalloc")
+        if stacks:
+            with open(f"{base}.folded", 'w', encoding='utf-8') as out:
+                out.writelines(f"{stack} {count}\n" for stack, count in stacks.items())
+
+    def stop(self) -> None:
+        if self.sampler is not None:
+            self.sampler.stop()
+
+    def stats(self) -> dict:
+        return {
+            "profiled": self.profiled,
+            "slow": self.slow,
+            "samples": len(self.sampler.samples) if self.sampler is not None else 0,
+        }
+
+
+request_profiler = RequestProfiler(
+    directory=settings.profiling.directory,
+    sample_rate=settings.profiling.sample_rate,
+    slow_ms=settings.profiling.slow_ms,
+    sampler_interval_ms=settings.profiling.sampler_interval_ms,
+    sampler_window=settings.profiling.sampler_window
+)
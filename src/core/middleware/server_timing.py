@@ -0,0 +1,49 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional
+import time
+
+from src.core.dependencies.metrics import RequestPhases, request_phases
+from src.core.middleware.profiler import RequestProfiler
+
+
+def server_timing(phases: RequestPhases, total: float) -> str:
+    """Header value, durations in milliseconds as the spec wants"""
+    entries = [f"{phase};dur={duration * 1000:.2f}" for phase, duration in phases.durations.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ', '.join(entries)
+
+
+class ServerTimingMiddleware:
+    """
+    Pure ASGI: collects the request's timed() phases (db, hash, sign, verify, render)
+    into a Server-Timing header and hands sampled or slow requests to the profiler.
+    No BaseHTTPMiddleware, so streaming responses and the request task are left alone.
+    """
+
+    def __init__(self, app: ASGIApp, add_header: bool = True, profiler: Optional[RequestProfiler] = None):
+        self.app = app
+        self.add_header = add_header
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        phases = RequestPhases()
+        token = request_phases.set(phases)
+        run = self.profiler.start() if self.profiler is not None else None
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message['type'] == 'http.response.start' and self.add_header:
+                value = server_timing(phases, time.perf_counter() - started)
+                message = {**message, 'headers': [*message.get('headers', []), (b'server-timing', value.encode('latin-1'))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_phases.reset(token)
+            if self.profiler is not None:
+                await self.profiler.finish(run, scope, started, time.perf_counter())
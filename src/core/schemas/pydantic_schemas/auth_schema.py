@@ -1,4 +1,4 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -17,9 +17,25 @@ class RefreshToken(BaseModel):
     family_id: str
     previous_token_id: Optional[int] = None
     device_info: Optional[str] = None
+    jti: Optional[str] = None
 
     @field_validator('expires_at')
     def ensure_timezone(cls, v):
         if v.tzinfo is None:
             return v.replace(tzinfo=timezone.utc)
-        return v
\ No newline at end of file
+        return v
+
+class IntrospectionRequest(BaseModel):
+    """Batch of tokens to introspect, duplicates are resolved once"""
+    tokens: list[str] = Field(min_length=1, max_length=1000)
+
+class IntrospectionResult(BaseModel):
+    """RFC 7662 response, only `active` is set for inactive tokens"""
+    active: bool
+    sub: Optional[str] = None
+    token_type: Optional[str] = None
+    exp: Optional[int] = None
+    iat: Optional[int] = None
+
+class IntrospectionResponse(BaseModel):
+    results: list[IntrospectionResult]
\ No newline at end of file
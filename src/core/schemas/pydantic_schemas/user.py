@@ -15,4 +15,22 @@ class UserSchema(UserLogin):
     def check_passwords_match(self):
         if self.password != self.password_again:
             raise ValueError("Passwords do not match")
-        return self
\ No newline at end of file
+        return self
+
+class UserImportError(BaseModel):
+    line: int
+    username: Optional[str] = None
+    error: str
+
+class UserImportReport(BaseModel):
+    """Outcome of a bulk import, the lists stop growing at the report limit while the counters don't"""
+    imported: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    duplicate_usernames: list[str] = []
+    errors: list[UserImportError] = []
+
+class UserPage(BaseModel):
+    """Keyset page of users, pass next_after as after to get the following page"""
+    items: list[dict]
+    next_after: Optional[int] = None
@@ -0,0 +1,85 @@
+"""
+Pick password hashing cost parameters for this machine.
+
+    python -m src.core.services.auth.calibrate_hasher --scheme argon2 --target-ms 250
+
+Prints the FAST__HASHING__* settings whose verification time is closest to the target.
+Stored hashes below the chosen cost are upgraded transparently on the next login.
+"""
+from passlib.hash import argon2, bcrypt
+from typing import Callable
+import argparse
+import statistics
+import time
+
+
+def measure(verify: Callable[[], bool], samples: int) -> float:
+    """Median verification time in milliseconds"""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        verify()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def calibrate_bcrypt(target_ms: float, samples: int) -> dict:
+    best: tuple[float, int] | None = None
+    for rounds in range(10, 17):
+        handler = bcrypt.using(rounds=rounds)
+        hashed = handler.hash('calibration')
+        elapsed = measure(lambda: handler.verify('calibration', hashed), samples)
+        print(f"bcrypt rounds={rounds}: {elapsed:.1f} ms")
+        if best is None or abs(elapsed - target_ms) < abs(best[0] - target_ms):
+            best = (elapsed, rounds)
+        if elapsed > target_ms:
+            break
+    return {"FAST__HASHING__SCHEME": "bcrypt", "FAST__HASHING__BCRYPT_ROUNDS": best[1]}
+
+def calibrate_argon2(target_ms: float, samples: int, memory_cost: int, parallelism: int) -> dict:
+    best: tuple[float, int, int] | None = None
+    while best is None or (best[0] > target_ms and memory_cost > 8 * 1024):
+        for time_cost in range(1, 11):
+            handler = argon2.using(
+                type='ID',
+                rounds=time_cost,
+                memory_cost=memory_cost,
+                parallelism=parallelism
+            )
+            hashed = handler.hash('calibration')
+            elapsed = measure(lambda: handler.verify('calibration', hashed), samples)
+            print(f"argon2id m={memory_cost} t={time_cost} p={parallelism}: {elapsed:.1f} ms")
+            if best is None or abs(elapsed - target_ms) < abs(best[0] - target_ms):
+                best = (elapsed, time_cost, memory_cost)
+            if elapsed > target_ms:
+                break
+        # Even a single pass is too slow at this memory size, retry with less memory
+        memory_cost //= 2
+
+    return {
+        "FAST__HASHING__SCHEME": "argon2",
+        "FAST__HASHING__ARGON2_TIME_COST": best[1],
+        "FAST__HASHING__ARGON2_MEMORY_COST": best[2],
+        "FAST__HASHING__ARGON2_PARALLELISM": parallelism,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scheme', choices=('bcrypt', 'argon2'), default='argon2')
+    parser.add_argument('--target-ms', type=float, default=250.0, help='verification latency to aim for')
+    parser.add_argument('--samples', type=int, default=5)
+    parser.add_argument('--memory-cost', type=int, default=65536, help='argon2 starting memory in KiB')
+    parser.add_argument('--parallelism', type=int, default=4, help='argon2 lanes')
+    args = parser.parse_args()
+
+    if args.scheme == 'bcrypt':
+        result = calibrate_bcrypt(args.target_ms, args.samples)
+    else:
+        result = calibrate_argon2(args.target_ms, args.samples, args.memory_cost, args.parallelism)
+
+    print()
+    for key, value in result.items():
+        print(f"{key}={value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+import asyncio
+import logging
+import time
+
+from src.core.config.config import settings
+from src.core.config.auth_config import pwd_context
+
+
+logger = logging.getLogger(__name__)
+
+def hash_password(password: str) -> str:
+    """Hash password with the configured scheme and cost"""
+    return pwd_context.hash(password)
+
+def verify_password(password: str, hashed: str) -> bool:
+    """Check password against a stored hash, malformed hashes never match"""
+    try:
+        return pwd_context.verify(password, hashed)
+    except ValueError as err:
+        logger.error(f"Password verification failed: {err}")
+        return False
+
+def verify_and_update_password(password: str, hashed: str) -> tuple[bool, Optional[str]]:
+    """Like verify_password, also returns a new hash when the stored one is below the current policy"""
+    try:
+        return pwd_context.verify_and_update(password, hashed)
+    except ValueError as err:
+        logger.error(f"Password verification failed: {err}")
+        return False, None
+
+def _timed_call(fn: Callable[..., Any], *args: Any) -> tuple[float, Any]:
+    # Runs in the worker; wall clock so the start time is comparable across processes
+    return time.time(), fn(*args)
+
+
+class HashExecutor:
+    """Bounded pool that keeps bcrypt work off the event loop"""
+
+    def __init__(self, max_workers: int = 4, use_processes: bool = False):
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='hash'
+                )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        self._in_flight += 1
+        try:
+            started, result = await loop.run_in_executor(
+                self._get_executor(), _timed_call, fn, *args
+            )
+        finally:
+            self._in_flight -= 1
+
+        wait = max(0.0, started - submitted)
+        self._completed += 1
+        self._wait_total += wait
+        self._wait_last = wait
+        self._wait_max = max(self._wait_max, wait)
+        return result
+
+    async def hash_password(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify_password(self, password: str, hashed: str) -> bool:
+        return await self.run(verify_password, password, hashed)
+
+    async def verify_and_update_password(self, password: str, hashed: str) -> tuple[bool, Optional[str]]:
+        return await self.run(verify_and_update_password, password, hashed)
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs submitted but not yet picked up by a worker"""
+        return max(0, self._in_flight - self.max_workers)
+
+    def stats(self) -> dict:
+        return {
+            "executor": "process" if self.use_processes else "thread",
+            "max_workers": self.max_workers,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self._completed,
+            "wait_avg_ms": (self._wait_total / self._completed * 1000) if self._completed else 0.0,
+            "wait_max_ms": self._wait_max * 1000,
+            "wait_last_ms": self._wait_last * 1000,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+hash_executor = HashExecutor(
+    max_workers=settings.hashing.max_workers,
+    use_processes=settings.hashing.executor == 'process'
+)
@@ -0,0 +1,78 @@
+from jose import jwk, JWTError
+from typing import Optional
+import hashlib
+import json
+
+from src.core.config.config import settings
+from src.core.config.models import JwtKey
+
+
+class KeyRing:
+    """Signing key plus every key still accepted for verification, addressed by kid"""
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret: str,
+        keys: list[JwtKey],
+        signing_kid: Optional[str] = None
+    ):
+        self.algorithm = algorithm
+        self.symmetric = algorithm.startswith('HS')
+        self._verification: dict[Optional[str], str] = {}
+        self._jwks: list[dict] = []
+
+        if self.symmetric:
+            self._signing: tuple[Optional[str], str] = (None, secret)
+            self._verification[None] = secret
+        else:
+            self._signing = self._load(keys, signing_kid)
+
+        self.jwks = {"keys": self._jwks}
+        self.jwks_etag = '"%s"' % hashlib.sha256(
+            json.dumps(self.jwks, sort_keys=True).encode()
+        ).hexdigest()[:32]
+
+    def _load(self, keys: list[JwtKey], signing_kid: Optional[str]) -> tuple[str, str]:
+        signing: Optional[tuple[str, str]] = None
+
+        for key in keys:
+            private_pem = key.private_pem
+            public_pem = key.public_pem
+            if public_pem is None:
+                if private_pem is None:
+                    raise ValueError(f"JWT key {key.kid} has neither public nor private key")
+                public_pem = jwk.construct(private_pem, self.algorithm).public_key().to_pem().decode()
+
+            self._verification[key.kid] = public_pem
+            public_jwk = jwk.construct(public_pem, self.algorithm).to_dict()
+            public_jwk.update({"kid": key.kid, "use": "sig", "alg": self.algorithm})
+            self._jwks.append(public_jwk)
+
+            if private_pem and signing is None and signing_kid in (None, key.kid):
+                signing = (key.kid, private_pem)
+
+        if signing is None:
+            raise ValueError(f"No private key configured for {self.algorithm} signing (kid={signing_kid})")
+        return signing
+
+    @property
+    def signing_key(self) -> tuple[Optional[str], str]:
+        """(kid, key) used for new tokens"""
+        return self._signing
+
+    def verification_key(self, kid: Optional[str]) -> str:
+        if self.symmetric:
+            return self._verification[None]
+        try:
+            return self._verification[kid]
+        except KeyError:
+            raise JWTError(f"Unknown key id: {kid}")
+
+
+keyring = KeyRing(
+    algorithm=settings.jwt.algorithm,
+    secret=settings.jwt.key,
+    keys=settings.jwt.keys,
+    signing_kid=settings.jwt.signing_kid
+)
@@ -0,0 +1,45 @@
+from typing import Any
+
+
+class Principal:
+    """
+    Who is making the request: just what authorization needs, immutable and uninstrumented.
+    Built from access-token claims, or from a column-projected query for tokens without them.
+    """
+    __slots__ = ('id', 'username', 'is_active', 'is_superuser', 'token_version')
+
+    FIELDS = __slots__
+
+    def __init__(self, id: int, username: str, is_active: bool = False, is_superuser: bool = False, token_version: int = 0):
+        for field, value in zip(self.FIELDS, (id, username, is_active, is_superuser, token_version)):
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Principal) and all(getattr(self, f) == getattr(other, f) for f in self.FIELDS)
+
+    def __hash__(self) -> int:
+        return hash(tuple(getattr(self, field) for field in self.FIELDS))
+
+    def __repr__(self):
+        return f"<Principal(id={self.id}, username={self.username})>"
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> "Principal":
+        return cls(
+            id=int(payload["sub"]),
+            username=payload["username"],
+            is_active=payload.get("is_active", False),
+            is_superuser=payload.get("is_superuser", False),
+            token_version=payload.get("ver", 0)
+        )
+
+    @classmethod
+    def from_user(cls, user: Any) -> "Principal":
+        """From anything with the user attributes: a model, a cached user or a row"""
+        return cls(*(getattr(user, field) for field in cls.FIELDS))
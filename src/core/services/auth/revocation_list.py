@@ -0,0 +1,159 @@
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from typing import Iterable, Optional
+import asyncio
+import hashlib
+import logging
+import math
+import time
+
+from src.core.config.config import settings
+from src.core.dependencies.redis_helper import redis_helper
+
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter, sized for capacity items at the given false positive rate"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """
+    Revoked token ids (jti) kept in Redis with a TTL equal to the token's remaining lifetime.
+    A local Bloom filter answers the common "not revoked" case without a network hop;
+    it is fed by a pub/sub channel and rebuilt periodically to shed expired ids.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        capacity: int = 100000,
+        error_rate: float = 0.01,
+        prefix: str = 'revoked',
+    ):
+        self.redis = redis
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.prefix = prefix
+        self.channel = f"{prefix}:events"
+        self._bloom = BloomFilter(capacity, error_rate)
+        # Revocations Redis did not accept, enforced locally until they expire
+        self._pending: dict[str, float] = {}
+        self.bloom_negatives = 0
+        self.redis_checks = 0
+
+    def _key(self, jti: str) -> str:
+        return f"{self.prefix}:{jti}"
+
+    async def revoke_many(self, items: Iterable[tuple[str, float]]) -> None:
+        """Revoke (jti, exp timestamp) pairs, already expired ones are skipped"""
+        now = time.time()
+        items = [(jti, expires_at) for jti, expires_at in items if jti and expires_at > now]
+        if not items:
+            return
+
+        for jti, _ in items:
+            self._bloom.add(jti)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for jti, expires_at in items:
+                    pipe.set(self._key(jti), 1, ex=math.ceil(expires_at - now))
+                    pipe.publish(self.channel, jti)
+                await pipe.execute()
+        except (RedisError, OSError) as err:
+            logger.error(f"Failed to publish {len(items)} revocations: {err}")
+            self._pending.update(items)
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        await self.revoke_many([(jti, expires_at)])
+
+    async def is_revoked(self, jti: str) -> bool:
+        if jti not in self._bloom:
+            self.bloom_negatives += 1
+            return False
+
+        expires_at = self._pending.get(jti)
+        if expires_at is not None and expires_at > time.time():
+            return True
+
+        self.redis_checks += 1
+        try:
+            return bool(await self.redis.exists(self._key(jti)))
+        except (RedisError, OSError) as err:
+            # The filter says it may be revoked and we cannot confirm otherwise
+            logger.error(f"Revocation check failed, rejecting token: {err}")
+            return True
+
+    async def rebuild(self) -> None:
+        """Replace the filter with the ids currently in Redis plus pending local ones"""
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        prefix_len = len(self.prefix) + 1
+        async for key in self.redis.scan_iter(match=f"{self.prefix}:*", count=1000):
+            key = key.decode()
+            if key != self.channel:
+                bloom.add(key[prefix_len:])
+
+        now = time.time()
+        self._pending = {jti: exp for jti, exp in self._pending.items() if exp > now}
+        for jti in self._pending:
+            bloom.add(jti)
+
+        if bloom.count > self.capacity:
+            logger.warning(f"Revocation list holds {bloom.count} ids, above Bloom capacity {self.capacity}")
+        self._bloom = bloom
+
+    async def run(self, rebuild_interval: float = 300) -> None:
+        """Background loop: follow revocations from other workers, rebuild on an interval"""
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    # Subscribe before the rebuild so nothing published in between is lost
+                    await pubsub.subscribe(self.channel)
+                    await self.rebuild()
+                    deadline = time.monotonic() + rebuild_interval
+                    while time.monotonic() < deadline:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            self._bloom.add(message["data"].decode())
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError) as err:
+                logger.warning(f"Revocation list sync failed: {err}")
+                await asyncio.sleep(5)
+
+    def stats(self) -> dict:
+        return {
+            "bloom_items": self._bloom.count,
+            "bloom_capacity": self.capacity,
+            "bloom_negatives": self.bloom_negatives,
+            "redis_checks": self.redis_checks,
+            "pending": len(self._pending),
+        }
+
+
+revocation_list = RevocationList(
+    redis=redis_helper.client,
+    capacity=settings.revocation.bloom_capacity,
+    error_rate=settings.revocation.bloom_error_rate
+)
@@ -0,0 +1,50 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+
+from src.core.dependencies.metrics import REVOCATIONS, TOKEN_REUSE
+from src.core.services.auth.revocation_list import RevocationList, revocation_list
+from src.core.services.database.postgres.models.refresh_token import RefreshTokenModel
+from src.core.services.database.postgres.orm.token_crud import revoke_tokens
+
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationService:
+    """Set-based refresh token revocation, every scope costs one UPDATE ... RETURNING"""
+
+    def __init__(self, revoked: RevocationList = revocation_list):
+        self.revocation_list = revoked
+
+    async def _publish(self, rows: list[tuple[int, Optional[str], datetime]], scope: str) -> int:
+        REVOCATIONS.labels(scope).inc(len(rows))
+        await self.revocation_list.revoke_many(
+            (jti, expires_at.replace(tzinfo=timezone.utc).timestamp())
+            for _, jti, expires_at in rows
+            if jti
+        )
+        return len(rows)
+
+    async def revoke_user(self, session: AsyncSession, user_id: int) -> int:
+        return await self._publish(await revoke_tokens(session, user_id=user_id), 'user')
+
+    async def revoke_device(self, session: AsyncSession, user_id: int, device_info: str) -> int:
+        return await self._publish(await revoke_tokens(session, user_id=user_id, device_info=device_info), 'device')
+
+    async def revoke_family(self, session: AsyncSession, family_id: str) -> int:
+        return await self._publish(await revoke_tokens(session, family_id=family_id), 'family')
+
+    async def revoke_reused(self, session: AsyncSession, token_record: RefreshTokenModel) -> int:
+        """A revoked token came back: kill its family, every rotation of it shares the family_id"""
+        TOKEN_REUSE.inc()
+        rows = await revoke_tokens(session, family_id=token_record.family_id)
+        logger.warning(
+            f"Refresh token reuse for user {token_record.user_id}, family {token_record.family_id}: "
+            f"{len(rows)} tokens revoked"
+        )
+        return await self._publish(rows, 'reuse')
+
+
+revocation_service = RevocationService()
@@ -0,0 +1,182 @@
+"""
+Expired refresh token reaper.
+
+refresh_tokens is range partitioned by expires_at: a pass creates the partitions
+upcoming tokens will land in and drops the ones that only hold expired tokens.
+Tokens outside every range sit in the default partition, which is never dropped,
+so each pass also deletes its expired rows in throttled batches.
+Runs inside the app lifespan, or once from the command line:
+
+    python -m src.core.services.auth.token_reaper [--all] [--batch-size 1000]
+
+--all deletes every refresh token in batches instead.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import argparse
+import asyncio
+import logging
+import time
+
+from src.core.config.config import settings
+from src.core.dependencies.db_helper import db_helper
+from src.core.services.database.postgres.orm.token_crud import delete_token_batch
+from src.core.services.database.postgres.orm.token_partitions import (
+    ensure_token_partitions,
+    drop_expired_token_partitions,
+    partition_step,
+    try_maintenance_lock,
+    DEFAULT_PARTITION
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenReaper:
+    """Keeps refresh_tokens partitions ahead of time and expires tokens by dropping partitions"""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        batch_size: int = 1000,
+        pause: float = 0.1,
+        interval: float = 300,
+        partition_interval: str = 'week',
+        horizon: timedelta = timedelta(weeks=4),
+        lock_timeout_ms: int = 2000
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.pause = pause
+        self.interval = interval
+        self.partition_interval = partition_interval
+        self.horizon = horizon
+        self.lock_timeout_ms = lock_timeout_ms
+        self.partitions_created = 0
+        self.partitions_dropped = 0
+        self.passes_skipped = 0
+        self.deleted_total = 0
+        self.batches_total = 0
+        self.last_run_deleted = 0
+        self.last_run_seconds = 0.0
+        self.last_run_at: Optional[float] = None
+
+    async def maintain(self) -> list[str]:
+        """
+        One pass: create upcoming partitions, then detach and drop fully expired ones.
+        Every worker runs a reaper, only the one holding the advisory lock does the pass;
+        the lock lives in its own session because the DDL commits partition by partition.
+        """
+        started = time.monotonic()
+        now = datetime.now(timezone.utc)
+        async with self.session_factory() as lock_session:
+            if not await try_maintenance_lock(lock_session):
+                self.passes_skipped += 1
+                logger.debug("Reaper pass skipped, another worker is maintaining partitions")
+                return []
+            async with self.session_factory() as session:
+                created = await ensure_token_partitions(
+                    session, now, self.horizon, self.partition_interval, self.lock_timeout_ms
+                )
+                dropped = await drop_expired_token_partitions(session, now, self.lock_timeout_ms)
+
+        self.partitions_created += len(created)
+        self.partitions_dropped += len(dropped)
+        self.last_run_seconds = time.monotonic() - started
+        self.last_run_at = time.time()
+        logger.info(
+            f"Reaper pass created {len(created)} and dropped {len(dropped)} partitions "
+            f"({self.last_run_seconds:.2f}s)"
+        )
+        return dropped
+
+    async def reap(
+        self,
+        purge_all: bool = False,
+        max_batches: Optional[int] = None,
+        partition: Optional[str] = None
+    ) -> int:
+        """Row deletes: batches until a short batch shows nothing is left"""
+        started = time.monotonic()
+        deleted = 0
+        batches = 0
+        async with self.session_factory() as session:
+            while max_batches is None or batches < max_batches:
+                batch = await delete_token_batch(session, self.batch_size, purge_all=purge_all, partition=partition)
+                batches += 1
+                deleted += batch
+                if batch < self.batch_size:
+                    break
+                logger.debug(f"Reaper progress: {deleted} tokens deleted in {batches} batches")
+                await asyncio.sleep(self.pause)
+
+        self.deleted_total += deleted
+        self.batches_total += batches
+        self.last_run_deleted = deleted
+        self.last_run_seconds = time.monotonic() - started
+        self.last_run_at = time.time()
+        logger.info(f"Reaper pass deleted {deleted} tokens in {batches} batches ({self.last_run_seconds:.2f}s)")
+        return deleted
+
+    async def sweep_default(self) -> int:
+        """Expired rows of the default partition, dropping partitions never reaches them"""
+        return await self.reap(partition=DEFAULT_PARTITION)
+
+    async def run(self) -> None:
+        while True:
+            # A failed partition pass (e.g. lock timeout) must not skip the sweep
+            for step in (self.maintain, self.sweep_default):
+                try:
+                    await step()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as err:
+                    logger.error(f"Reaper pass failed: {err}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "partitions_created": self.partitions_created,
+            "partitions_dropped": self.partitions_dropped,
+            "passes_skipped": self.passes_skipped,
+            "deleted_total": self.deleted_total,
+            "batches_total": self.batches_total,
+            "last_run_deleted": self.last_run_deleted,
+            "last_run_seconds": self.last_run_seconds,
+            "last_run_at": self.last_run_at,
+        }
+
+
+token_reaper = TokenReaper(
+    session_factory=db_helper.session_factory,
+    batch_size=settings.reaper.batch_size,
+    pause=settings.reaper.pause,
+    interval=settings.reaper.interval,
+    partition_interval=settings.token_partitions.interval,
+    horizon=timedelta(days=settings.jwt.REFRESH_TOKEN_EXPIRE_DAYS)
+    + settings.token_partitions.premake * partition_step(settings.token_partitions.interval),
+    lock_timeout_ms=settings.token_partitions.lock_timeout_ms
+)
+
+
+async def _main(purge_all: bool, batch_size: int) -> None:
+    token_reaper.batch_size = batch_size
+    try:
+        if purge_all:
+            await token_reaper.reap(purge_all=True)
+        else:
+            await token_reaper.maintain()
+            await token_reaper.sweep_default()
+    finally:
+        await db_helper.dispose()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--all', action='store_true', help='delete every refresh token, not only expired ones')
+    parser.add_argument('--batch-size', type=int, default=settings.reaper.batch_size)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.all, args.batch_size))
@@ -1,5 +1,6 @@
 from jose import JWTError, jwt
 from secrets import token_urlsafe
+from uuid import uuid4
 from fastapi import HTTPException, status, Response, Request
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
@@ -13,18 +14,29 @@ from src.core.config.auth_config import (
     ACCESS_TYPE,
     REFRESH_TYPE,
     CSRF_TYPE,
-    pwd_context
+    pwd_context,
+    token_digest
 )
 from src.core.schemas.pydantic_schemas.auth_schema import RefreshToken
-from src.core.services.database.postgres.models.refresh_token import RefreshTokenModel
+from src.core.dependencies.metrics import REVOCATIONS, timed
+from src.core.services.auth.claims_cache import ClaimsCache, claims_cache
+from src.core.services.auth.keyring import KeyRing, keyring
 from src.core.services.database.postgres.models.user import UserModel
 from src.core.services.database.postgres.orm.token_crud import (
-    insert_data, 
     delete_data, 
-    delete_all_user_tokens, 
-    get_refresh_token_data,
-    select_data
+    select_latest_refresh_token,
+    select_tokens_by_digests,
+    select_token_family_id,
+    rekey_refresh_token
 )
+from src.core.services.database.postgres.orm.user_orm import (
+    select_user_states,
+    bump_token_version
+)
+from src.core.services.database.postgres.repository import user_repo, token_repo
+from src.core.services.auth.token_versions import TokenVersionCache, token_versions
+from src.core.services.auth.revocation_list import RevocationList, revocation_list
+from src.core.services.auth.revocation_service import RevocationService, revocation_service
 
 logger = logging.getLogger(__name__)
 
@@ -33,11 +45,50 @@ class TokenService:
         self, 
         secret_key: str = settings.jwt.key,
         algorithm: str = settings.jwt.algorithm,
-        pwd: CryptContext = pwd_context
+        pwd: CryptContext = pwd_context,
+        cache: ClaimsCache = claims_cache,
+        keys: KeyRing = keyring,
+        versions: TokenVersionCache = token_versions,
+        revoked: RevocationList = revocation_list,
+        revocations: RevocationService = revocation_service
     ):
         self.secret = secret_key
         self.algorithm = algorithm
         self.pwd_context = pwd
+        self.claims_cache = cache
+        self.keyring = keys
+        self.token_versions = versions
+        self.revocation_list = revoked
+        self.revocations = revocations
+
+    def decode_token(self, token: str) -> dict:
+        """Signature-checked payload, served from the claims cache when the token was seen before"""
+        payload = self.claims_cache.get(token)
+        if payload is None:
+            kid = jwt.get_unverified_header(token).get("kid")
+            payload = jwt.decode(
+                token,
+                self.keyring.verification_key(kid),
+                algorithms=[self.keyring.algorithm]
+            )
+            self.claims_cache.set(token, payload)
+        return payload
+
+    @staticmethod
+    def user_claims(user: UserModel) -> dict:
+        """Claims that let dependencies authorize an access token without a user lookup"""
+        return {
+            "sub": str(user.id),
+            "username": user.username,
+            "is_active": user.is_active,
+            "is_superuser": user.is_superuser,
+            "ver": user.token_version
+        }
+
+    async def is_token_outdated(self, session: AsyncSession, payload: dict) -> bool:
+        """True if the user is gone or bumped token_version after the token was issued"""
+        current = await self.token_versions.get(session, int(payload["sub"]))
+        return current is None or payload.get("ver", 0) < current
 
     async def generate_csrf_token(self) -> str:
         return token_urlsafe(32)
@@ -46,7 +97,7 @@ class TokenService:
         """Verify CSRF token from cookie matches header"""
         
         try:
-            payload = jwt.decode(token, self.secret, algorithms=[self.algorithm])
+            payload = self.decode_token(token)
             if payload.get("csrf") != csrf:
                 raise HTTPException(status_code=403, detail="CSRF token mismatch")
             return True
@@ -62,9 +113,16 @@ class TokenService:
         to_encode.update({
             "exp": expire, 
             "type": token_type,
-            "iat": date_now
+            "iat": date_now,
+            "jti": str(uuid4())
         })
-        return jwt.encode(to_encode, self.secret, algorithm=self.algorithm)
+        kid, key = self.keyring.signing_key
+        return jwt.encode(
+            to_encode,
+            key,
+            algorithm=self.keyring.algorithm,
+            headers={"kid": kid} if kid else None
+        )
     
     async def create_access_token(self, data: dict) -> str:
         return await self.create_token(
@@ -92,25 +150,102 @@ class TokenService:
             CSRF_TYPE: csrf_token
         }
 
-    async def verify_token(self, token: str, token_type: str) -> dict:
-        """Generic token verification method"""
+    async def verify_token(self, token: str, token_type: str, check_revoked: bool = True) -> dict:
+        """Generic token verification method, check_revoked=False leaves the revocation list to the caller"""
         try:
-            payload = jwt.decode(token, self.secret, algorithms=[self.algorithm])
+            with timed('verify_token', 'verify'):
+                payload = self.decode_token(token)
             if payload.get("type") != token_type:
                 raise credentials_exception
-            return payload
-        
         except JWTError:
             raise credentials_exception
+
+        jti = payload.get("jti")
+        if jti and check_revoked:
+            with timed('verify_token', 'revocation_list'):
+                revoked = await self.revocation_list.is_revoked(jti)
+            if revoked:
+                raise credentials_exception
+        return payload
+
+    async def revoke_jti(self, token: str) -> None:
+        """Put the token's jti on the revocation list until the token expires"""
+        try:
+            payload = jwt.get_unverified_claims(token)
+        except JWTError:
+            return
+        if payload.get("jti") and payload.get("exp"):
+            await self.revocation_list.revoke(payload["jti"], float(payload["exp"]))
     
+    async def introspect_tokens(self, session: AsyncSession, tokens: list[str]) -> list[dict]:
+        """
+        RFC 7662 introspection for a batch of tokens:
+        1. Verify each distinct token once
+        2. Resolve refresh token revocation with one query
+        3. Resolve user active state and token_version with one query,
+           tokens issued before the user's last version bump are inactive
+        """
+        payloads: dict[str, Optional[dict]] = {}
+        for token in dict.fromkeys(tokens):
+            try:
+                payload = self.decode_token(token)
+            except JWTError:
+                payload = None
+            if payload and payload.get("jti") and await self.revocation_list.is_revoked(payload["jti"]):
+                payload = None
+            payloads[token] = payload
+
+        digests = {
+            token: self.hash_token(token)
+            for token, payload in payloads.items()
+            if payload and payload.get("type") == REFRESH_TYPE
+        }
+        token_records = await select_tokens_by_digests(session, list(digests.values()))
+
+        user_ids = {
+            int(payload["sub"])
+            for payload in payloads.values()
+            if payload and str(payload.get("sub", "")).isdigit()
+        }
+        user_states = await select_user_states(session, list(user_ids))
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        results: dict[str, dict] = {}
+        for token, payload in payloads.items():
+            sub = str(payload.get("sub", "")) if payload else ""
+            state = user_states.get(int(sub)) if sub.isdigit() else None
+            active = state is not None and state[0] is True and payload.get("ver", 0) >= state[1]
+
+            if active and token in digests:
+                token_record = token_records.get(digests[token])
+                active = token_record is not None \
+                    and not token_record.revoked \
+                    and token_record.expires_at > now
+
+            if not active:
+                results[token] = {"active": False}
+                continue
+            results[token] = {
+                "active": True,
+                "sub": payload["sub"],
+                "token_type": payload.get("type"),
+                "exp": payload.get("exp"),
+                "iat": payload.get("iat")
+            }
+
+        return [results[token] for token in tokens]
+
     def hash_token(self, token: str) -> str:
-        """Hash token before storage"""
-        return self.pwd_context.hash(token)
+        """Keyed digest of the token, stored and looked up instead of the raw value"""
+        return token_digest(token)
     
     async def is_token_revoked(self, session: AsyncSession, token: str) -> bool:
         """Check if token was revoked"""
-        hashed_token = self.hash_token(token)
-        stored_token = await get_refresh_token_data(session, hashed_token)
+        stored_token = await select_latest_refresh_token(
+            session,
+            token=self.hash_token(token),
+            include_revoked=True
+        )
         return stored_token is not None and stored_token.revoked
     
     async def rotate_tokens(
@@ -120,14 +255,17 @@ class TokenService:
     ) -> dict:
         """
         Full token rotation flow:
-        1. Verify old refresh token
-        2. Check for token reuse
+        1. Verify old refresh token (signature and type)
+        2. Check for token reuse: a jti on the revocation list or a revoked row
+           revokes the whole family
         3. Create new tokens
         4. Revoke old token
         """
         try:
             # 1. Verify token
-            payload = self.verify_token(refresh_token, REFRESH_TYPE)
+            with timed('refresh', 'verify'):
+                # A rotated-out token is on the revocation list, it must still reach reuse detection
+                payload = await self.verify_token(refresh_token, REFRESH_TYPE, check_revoked=False)
             user_id = payload.get("sub")
             if not user_id:
                 raise HTTPException(
@@ -136,11 +274,8 @@ class TokenService:
                 )
             
             # 2. Get existing token record
-            old_token_record = await select_data(
-                session,
-                token=refresh_token,  # Now passing raw token
-                model_type=RefreshToken
-            )
+            with timed('refresh', 'db'):
+                old_token_record = await token_repo.select_refresh_token(session, refresh_token)
 
             logger.debug(f'{old_token_record=}')
             
@@ -149,33 +284,62 @@ class TokenService:
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid refresh token"
                 )
+            if old_token_record.token != self.hash_token(refresh_token):
+                # Matched by the bcrypt fallback, committed with the rotation or the reuse revocation
+                await rekey_refresh_token(
+                    session, old_token_record.id, old_token_record.expires_at, self.hash_token(refresh_token)
+                )
                 
             # Check if token was already revoked
-            if old_token_record.revoked:
-                await self.revoke_all_user_tokens(session, user_id)
+            with timed('refresh', 'revocation_list'):
+                jti_revoked = bool(payload.get("jti")) and await self.revocation_list.is_revoked(payload["jti"])
+            if old_token_record.revoked or jti_revoked:
+                await self.revocations.revoke_reused(session, old_token_record)
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Refresh token was reused"
                 )
             
+            with timed('refresh', 'db'):
+                user = await user_repo.select_principal(session, int(user_id))
+            if user is None or payload.get("ver", 0) < user.token_version:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Refresh token was revoked"
+                )
+
             # 3. Create new tokens
-            new_tokens = await self.create_both_tokens({"sub": user_id})
-            hashed_new_token = self.hash_token(new_tokens[REFRESH_TYPE])
-            
-            # 4. Store new token and revoke old one
-            await insert_data(session, RefreshToken(
-                token=hashed_new_token,
-                user_id=user_id,
-                expires_at=datetime.now(timezone.utc) + timedelta(days=settings.jwt.REFRESH_TOKEN_EXPIRE_DAYS),
-                replaced_by_token=hashed_new_token,
-                family_id=old_token_record.family_id,
-                device_info=old_token_record.device_info
-            ))
+            with timed('refresh', 'sign'):
+                new_tokens = await self.create_both_tokens(self.user_claims(user))
+                hashed_new_token = self.hash_token(new_tokens[REFRESH_TYPE])
+                new_jti = self.decode_token(new_tokens[REFRESH_TYPE]).get("jti")
             
-            # Revoke old token
-            old_token_record.revoked = True
-            old_token_record.replaced_by_token = hashed_new_token
-            await session.commit()
+            # 4. Store new token and revoke old one, one transaction
+            with timed('refresh', 'db'):
+                await token_repo.add_refresh_token(session, RefreshToken(
+                    token=hashed_new_token,
+                    jti=new_jti,
+                    user_id=user_id,
+                    expires_at=datetime.now(timezone.utc) + timedelta(days=settings.jwt.REFRESH_TOKEN_EXPIRE_DAYS),
+                    replaced_by_token=hashed_new_token,
+                    family_id=old_token_record.family_id,
+                    previous_token_id=old_token_record.id,
+                    device_info=old_token_record.device_info
+                ))
+                
+                replaced = await token_repo.mark_token_replaced(
+                    session, old_token_record.id, old_token_record.expires_at, hashed_new_token
+                )
+                if not replaced:
+                    # A concurrent rotation revoked it between the lookup and now
+                    await session.rollback()
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="Refresh token was reused"
+                    )
+                await session.commit()
+            if payload.get("jti"):
+                await self.revocation_list.revoke(payload["jti"], float(payload["exp"]))
             
             return new_tokens
             
@@ -193,8 +357,11 @@ class TokenService:
         user_id: int,
         raw_token: str,
         previous_token_id: Optional[int] = None
-    ) -> None:
-        """Store refresh token with guaranteed naive UTC datetimes"""
+    ) -> int:
+        """
+        Add the refresh token to the session's transaction with one INSERT ... RETURNING,
+        the caller commits. Datetimes are stored as naive UTC.
+        """
         try:
             # Create all datetimes as timezone-aware UTC first
             utc_now = datetime.now(timezone.utc)
@@ -204,15 +371,16 @@ class TokenService:
             token_data = RefreshToken(
                 user_id=user_id,
                 token=self.hash_token(raw_token),
+                jti=self.decode_token(raw_token).get("jti"),
                 expires_at=expires_at,
                 created_at=utc_now,
                 family_id=token_urlsafe(16) if previous_token_id is None else (
-                    await session.get(RefreshTokenModel, previous_token_id)
-                ).family_id,
+                    await select_token_family_id(session, previous_token_id)
+                ),
                 previous_token_id=previous_token_id
             )
             
-            await insert_data(session, token_data)
+            return await token_repo.add_refresh_token(session, token_data)
             
         except Exception as e:
             logger.error(f"Token storage failed: {e}")
@@ -226,12 +394,17 @@ class TokenService:
         """Take token OR user_ir. If none of them provided, will raised ValueError("Invalid data type provided")"""
         logger.debug(f'{token=}')
         if token:
+            await self.revoke_jti(token)
             token = self.hash_token(token)
 
         await delete_data(session, token, user_id)
+        REVOCATIONS.labels('logout').inc()
 
     async def revoke_all_user_tokens(self, session: AsyncSession, user_id: int) -> None:
-        await delete_all_user_tokens(session, user_id)
+        """Outdate every access token with one version bump and revoke refresh tokens with one UPDATE"""
+        version = await bump_token_version(session, int(user_id))
+        self.token_versions.set(int(user_id), version)
+        await self.revocations.revoke_user(session, int(user_id))
 
     async def set_secure_cookies(
         self,
@@ -0,0 +1,40 @@
+from collections import OrderedDict
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import time
+
+from src.core.config.config import settings
+from src.core.services.database.postgres.orm.user_orm import select_token_version
+
+
+class TokenVersionCache:
+    """Small TTL map of user_id -> token_version backing stateless access-token checks"""
+
+    def __init__(self, ttl: float = 30, max_size: int = 65536):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._versions: OrderedDict[int, tuple[float, Optional[int]]] = OrderedDict()
+
+    async def get(self, session: AsyncSession, user_id: int) -> Optional[int]:
+        entry = self._versions.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        version = await select_token_version(session, user_id)
+        self.set(user_id, version)
+        return version
+
+    def set(self, user_id: int, version: Optional[int]) -> None:
+        self._versions[user_id] = (time.monotonic() + self.ttl, version)
+        self._versions.move_to_end(user_id)
+        while len(self._versions) > self.max_size:
+            self._versions.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._versions.pop(user_id, None)
+
+
+token_versions = TokenVersionCache(
+    ttl=settings.jwt.token_version_ttl,
+    max_size=settings.jwt.token_version_cache_size
+)
@@ -0,0 +1,229 @@
+"""
+Bulk user import: CSV or NDJSON rows, validated with UserSchema and loaded with COPY.
+
+Rows carry either `password` (hashed here, across a process pool from the CLI) or
+`password_hash`, a bcrypt/argon2 hash kept as-is. Each chunk is COPYed into a temp
+table and moved into users with ON CONFLICT DO NOTHING, so a duplicate username is
+reported instead of failing its chunk.
+
+    python -m src.core.services.auth.user_import users.csv [--format ndjson] [--chunk-size 1000] [--workers 8]
+"""
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import text
+from typing import Iterable, Iterator, Optional, TextIO, Union
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+
+from src.core.config.config import settings
+from src.core.config.auth_config import pwd_context
+from src.core.dependencies.db_helper import db_helper
+from src.core.schemas.pydantic_schemas.user import (
+    UserSchema,
+    UserImportError,
+    UserImportReport
+)
+from src.core.services.auth.hash_executor import HashExecutor, hash_password
+from src.core.services.database.postgres.models.user import UserModel
+
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('username', 'public_name', 'password', 'email', 'bio')
+STAGING_TABLE = 'users_import'
+
+
+def read_rows(stream: TextIO, fmt: str) -> Iterator[tuple[int, Union[dict, ValueError]]]:
+    """(line, row) pairs streamed from a CSV (with header) or NDJSON file, unparsable lines come as ValueError"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line, raw in enumerate(stream, start=1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError as err:
+            yield line, ValueError(f"invalid JSON: {err}")
+            continue
+        yield line, row if isinstance(row, dict) else ValueError("expected a JSON object")
+
+
+class UserImporter:
+    """Streams rows into users chunk by chunk, only one chunk of rows is held in memory"""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        executor: HashExecutor,
+        chunk_size: int = 1000,
+        report_limit: int = 1000
+    ):
+        self.session_factory = session_factory
+        self.executor = executor
+        self.chunk_size = chunk_size
+        self.report_limit = report_limit
+
+    def _error(self, report: UserImportReport, line: int, error: str, username: Optional[str] = None) -> None:
+        report.invalid += 1
+        if len(report.errors) < self.report_limit:
+            report.errors.append(UserImportError(line=line, username=username, error=error))
+
+    def _duplicate(self, report: UserImportReport, username: str) -> None:
+        report.duplicates += 1
+        if len(report.duplicate_usernames) < self.report_limit:
+            report.duplicate_usernames.append(username)
+
+    def _validate(self, report: UserImportReport, line: int, row: Union[dict, ValueError]) -> Optional[tuple[dict, bool]]:
+        """(user fields, password is pre-hashed) or None when the row was reported invalid"""
+        if isinstance(row, ValueError):
+            self._error(report, line, str(row))
+            return None
+
+        row = {key: value for key, value in row.items() if value not in (None, '')}
+        prehashed = 'password_hash' in row
+        if prehashed:
+            if pwd_context.identify(row['password_hash']) is None:
+                self._error(report, line, "password_hash is not a bcrypt or argon2 hash", row.get('username'))
+                return None
+            row['password'] = row.pop('password_hash')
+        row.setdefault('password_again', row.get('password'))
+
+        try:
+            user = UserSchema.model_validate(row)
+        except ValidationError as err:
+            message = '; '.join(f"{'.'.join(map(str, e['loc'])) or 'row'}: {e['msg']}" for e in err.errors())
+            self._error(report, line, message, row.get('username'))
+            return None
+        fields = user.model_dump(include=set(COLUMNS))
+
+        # One oversized value would fail the COPY of the whole chunk
+        for column, value in fields.items():
+            length = UserModel.__table__.c[column].type.length
+            if value is not None and len(value) > length and (column != 'password' or prehashed):
+                self._error(report, line, f"{column}: longer than {length} characters", fields['username'][:50])
+                return None
+        return fields, prehashed
+
+    async def _load(self, users: list[dict]) -> set[str]:
+        """COPY the chunk into a temp table and move it into users, returns the usernames actually inserted"""
+        async with self.session_factory() as session:
+            try:
+                await session.execute(text(
+                    f"CREATE TEMP TABLE {STAGING_TABLE} ("
+                    f"username varchar(50), public_name varchar(100), password varchar(128), "
+                    f"email varchar(255), bio varchar(500)"
+                    f") ON COMMIT DROP"
+                ))
+                connection = await session.connection()
+                raw_connection = await connection.get_raw_connection()
+                await raw_connection.driver_connection.copy_records_to_table(
+                    STAGING_TABLE,
+                    records=[tuple(user[column] for column in COLUMNS) for user in users],
+                    columns=list(COLUMNS)
+                )
+                result = await session.execute(text(
+                    f"INSERT INTO users ({', '.join(COLUMNS)}, is_active, is_superuser) "
+                    f"SELECT {', '.join(COLUMNS)}, false, false FROM {STAGING_TABLE} "
+                    f"ON CONFLICT (username) DO NOTHING RETURNING username"
+                ))
+                inserted = set(result.scalars().all())
+                await session.commit()
+                return inserted
+
+            except Exception as err:
+                await session.rollback()
+                logger.error(f"Failed to load import chunk: {err}")
+                raise err
+
+    async def _flush(self, report: UserImportReport, chunk: list[tuple[dict, bool]]) -> None:
+        hashes = await asyncio.gather(*(
+            self.executor.run(hash_password, user['password'])
+            for user, prehashed in chunk if not prehashed
+        ))
+        hashes = iter(hashes)
+        users = []
+        for user, prehashed in chunk:
+            if not prehashed:
+                user['password'] = next(hashes)
+            users.append(user)
+
+        inserted = await self._load(users)
+        report.imported += len(inserted)
+        for user in users:
+            if user['username'] not in inserted:
+                self._duplicate(report, user['username'])
+        logger.info(f"Import progress: {report.imported} imported, {report.duplicates} duplicates, {report.invalid} invalid")
+
+    def _next_chunk(
+        self,
+        report: UserImportReport,
+        rows: Iterator[tuple[int, Union[dict, ValueError]]],
+        seen: set[str]
+    ) -> list[tuple[dict, bool]]:
+        """Read and validate rows until a chunk is full or the input ends; blocking, runs in a thread"""
+        chunk: list[tuple[dict, bool]] = []
+        for line, row in rows:
+            validated = self._validate(report, line, row)
+            if validated is None:
+                continue
+            if validated[0]['username'] in seen:
+                self._duplicate(report, validated[0]['username'])
+                continue
+            seen.add(validated[0]['username'])
+            chunk.append(validated)
+            if len(chunk) >= self.chunk_size:
+                break
+        return chunk
+
+    async def import_rows(self, rows: Iterable[tuple[int, Union[dict, ValueError]]]) -> UserImportReport:
+        """Parsing and validation run in a worker thread, the event loop only awaits hashing and COPY"""
+        report = UserImportReport()
+        seen: set[str] = set()
+        rows = iter(rows)
+        while chunk := await asyncio.to_thread(self._next_chunk, report, rows, seen):
+            await self._flush(report, chunk)
+        return report
+
+
+# Own bounded pool: an import hashes thousands of passwords, the shared one serves logins
+import_executor = HashExecutor(
+    max_workers=settings.hashing.import_workers,
+    use_processes=settings.hashing.executor == 'process'
+)
+
+user_importer = UserImporter(
+    session_factory=db_helper.session_factory,
+    executor=import_executor
+)
+
+
+async def _main(path: str, fmt: str, chunk_size: int, workers: int) -> None:
+    executor = HashExecutor(max_workers=workers, use_processes=True)
+    importer = UserImporter(db_helper.session_factory, executor, chunk_size)
+    try:
+        with open(path, newline='', encoding='utf-8') as stream:
+            report = await importer.import_rows(read_rows(stream, fmt))
+        print(report.model_dump_json(indent=2))
+    finally:
+        executor.shutdown()
+        await db_helper.dispose()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=('csv', 'ndjson'), default=None, help='defaults to the file extension')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='password hashing processes')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    fmt = args.format or ('csv' if args.path.lower().endswith('.csv') else 'ndjson')
+    asyncio.run(_main(args.path, fmt, args.chunk_size, args.workers))
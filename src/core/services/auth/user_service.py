@@ -1,20 +1,28 @@
 from fastapi import Request, HTTPException, status, Response
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from datetime import datetime
+from typing import AsyncIterator, Optional, Sequence
 import logging
+import json
+import csv
+import io
 
 from src.core.services.auth.token_service import TokenService
 from src.core.schemas.pydantic_schemas.auth_schema import RefreshToken
 from src.core.services.database.postgres.models.user import UserModel
-from src.core.schemas.pydantic_schemas.user import UserSchema
+from src.core.services.cache.user_cache import user_cache
+from src.core.dependencies.db_helper import commit_and_release
+from src.core.dependencies.metrics import LOGINS, timed
+from src.core.schemas.pydantic_schemas.user import UserSchema, UserPage
 from src.core.services.database.postgres.orm.user_orm import (
     select_data_user, 
     insert_data, 
-    get_all_users, 
+    select_users_page,
+    stream_users,
     delete_users, 
-    select_data_user_id,
     user_activate
     )
+from src.core.services.database.postgres.repository import user_repo
 from src.core.config.auth_config import (
     credentials_exception,
     ACCESS_TYPE,
@@ -29,9 +37,42 @@ class UserService:
         self.session = session
         self.token_service = token_service  # Use injected service
 
-    #Not for production, delete later
-    async def get_all_users(self) -> list[UserModel]:
-        return await get_all_users(self.session)
+    async def list_users(self, after: Optional[int], limit: int, fields: Sequence[str]) -> UserPage:
+        items, next_after = await select_users_page(self.session, after, limit, fields)
+        return UserPage(items=items, next_after=next_after)
+
+    @staticmethod
+    async def export_users(
+        session_factory: async_sessionmaker[AsyncSession],
+        fields: Sequence[str],
+        fmt: str = 'ndjson',
+        batch_size: int = 1000
+    ) -> AsyncIterator[str]:
+        """
+        NDJSON or CSV chunks of every user, one chunk per cursor batch.
+        Opens its own session: a StreamingResponse outlives the request's dependencies.
+        """
+        def plain(value):
+            return value.isoformat() if isinstance(value, datetime) else value
+
+        columns = ['id'] + [field for field in fields if field != 'id']
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == 'csv':
+            writer.writerow(columns)
+
+        async with session_factory() as session:
+            async for batch in stream_users(session, fields, batch_size):
+                for row in batch:
+                    if fmt == 'csv':
+                        writer.writerow([plain(row[column]) for column in columns])
+                    else:
+                        buffer.write(json.dumps({key: plain(value) for key, value in row.items()}) + '\n')
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
     
     #Not for production, delete later
     async def delete_all_users(self) -> None:
@@ -39,18 +80,21 @@ class UserService:
     
     async def create_user(self, data: UserSchema) -> None:
         await insert_data(self.session, data)
+        # The refresh after the insert opened a transaction, don't hold it through rendering
+        await commit_and_release(self.session)
 
     async def disable_user(self, user_id:int):
-        await user_activate(self.session, user_id, False)
+        user = await user_activate(self.session, user_id, False)
+        self.token_service.token_versions.set(user.id, user.token_version)
 
-    async def activate_user(self, user_id:int):
-        await user_activate(self.session, user_id, True)
+    async def activate_user(self, user_id:int) -> UserModel:
+        return await user_activate(self.session, user_id, True)
     
     async def get_user_by_username(self, username: str, password:str) -> Optional[UserModel]:
         return await select_data_user(self.session, username, password)
     
     async def get_user_by_id(self, user_id:int) -> Optional[UserModel]:
-        return await select_data_user_id(self.session, user_id)
+        return await user_repo.select_data_user_id(self.session, user_id)
     
     async def verify_user_tokens(self, request:Request) -> dict:
         """If evcerything OK return nothing in any else cases raises the exception"""
@@ -70,31 +114,49 @@ class UserService:
     
 
     async def authenticate_user(self, username: str, password: str) -> Optional[dict]:
-        user = await self.get_user_by_username(username, password)
+        """
+        Login as one unit of work:
+        1. Credentials from one SELECT, verified off the event loop
+           with the connection back in the pool
+        2. UPDATE ... RETURNING activates the user, stamps the login and upgrades an outdated hash
+        3. INSERT ... RETURNING stores the refresh token
+        4. A single COMMIT
+        """
+        user, new_hash = await user_repo.verify_user_credentials(self.session, username, password)
         if not user:
+            LOGINS.labels('failure').inc()
             return None
-        
-        await self.activate_user(user.id)
             
         try:
-            # Create tokens
-            tokens = await self.token_service.create_both_tokens({"sub": str(user.id)})
-            
-            # Store refresh token
-            await self.token_service.store_refresh_token(
-                session=self.session,
-                user_id=user.id,
-                raw_token=tokens[REFRESH_TYPE]
-            )
-            return tokens
-            
+            with timed('login', 'db'):
+                user = await user_repo.record_login(self.session, user.id, new_hash)
+            if user is None:
+                LOGINS.labels('failure').inc()
+                return None
+
+            with timed('login', 'sign'):
+                tokens = await self.token_service.create_both_tokens(self.token_service.user_claims(user))
+            with timed('login', 'db'):
+                await self.token_service.store_refresh_token(
+                    session=self.session,
+                    user_id=user.id,
+                    raw_token=tokens[REFRESH_TYPE]
+                )
+                await self.session.commit()
+
         except Exception as err:
+            LOGINS.labels('error').inc()
             logger.error(f'Authentication failed: {err}')
             await self.session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Authentication processing failed"
             )
+
+        # The RETURNING row is the committed state, refresh the cache instead of dropping it
+        await user_cache.set(user)
+        LOGINS.labels('success').inc()
+        return tokens
     
     async def logout_user(self, request:Request, response:Response) -> None:
 
@@ -107,8 +169,8 @@ class UserService:
             user = await self.get_user_by_id(user_id)
             if user:
                 await self.disable_user(user_id)
-                #await user.revoke_all_tokens(self.session)
                 await self.token_service.revoke_token(session=self.session, token=refresh_token, user_id=user_id)
+                await self.token_service.revoke_jti(payload[ACCESS_TYPE])
 
             for cookie_name in [ACCESS_TYPE, REFRESH_TYPE, CSRF_TYPE]:
                 response.delete_cookie(
@@ -0,0 +1,205 @@
+from collections import OrderedDict
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from typing import Any, Optional
+import json
+import logging
+import time
+
+from src.core.config.config import settings
+from src.core.dependencies.redis_helper import redis_helper
+from src.core.services.database.postgres.models.user import UserModel
+
+
+logger = logging.getLogger(__name__)
+
+# Compact projection cached for a user, timestamps are left out on purpose.
+# So is the password hash: it never leaves the database, logins read it from the row.
+USER_FIELDS = (
+    'id',
+    'username',
+    'public_name',
+    'email',
+    'bio',
+    'is_active',
+    'is_superuser',
+    'token_version'
+)
+
+
+class UserCache:
+    """
+    Read-through user cache:
+    L1 - bounded in-process map with a short TTL
+    L2 - Redis, shared by all workers
+    Username/email keys only point at an id, the projection lives under the id key.
+    """
+
+    def __init__(
+        self,
+        redis: Optional[Redis],
+        enabled: bool = True,
+        l1_size: int = 10000,
+        l1_ttl: float = 5,
+        l2_ttl: int = 300,
+        prefix: str = 'user'
+    ):
+        self.redis = redis
+        self.enabled = enabled
+        self.l1_size = l1_size
+        self.l1_ttl = l1_ttl
+        self.l2_ttl = l2_ttl
+        self.prefix = prefix
+        self._l1: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.l2_errors = 0
+
+    def _key(self, field: str, value: Any) -> str:
+        return f"{self.prefix}:{field}:{value}"
+
+    # L1
+    def _l1_get(self, key: str) -> Any:
+        entry = self._l1.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._l1[key]
+            return None
+        self._l1.move_to_end(key)
+        return entry[1]
+
+    def _l1_set(self, key: str, value: Any) -> None:
+        self._l1[key] = (time.monotonic() + self.l1_ttl, value)
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.l1_size:
+            self._l1.popitem(last=False)
+
+    # L2
+    async def _l2_get(self, key: str) -> Optional[bytes]:
+        if self.redis is None:
+            return None
+        try:
+            return await self.redis.get(key)
+        except (RedisError, OSError) as err:
+            self.l2_errors += 1
+            logger.warning(f"User cache L2 get failed: {err}")
+            return None
+
+    async def _l2_set(self, mapping: dict[str, str]) -> None:
+        if self.redis is None:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    pipe.set(key, value, ex=self.l2_ttl)
+                await pipe.execute()
+        except (RedisError, OSError) as err:
+            self.l2_errors += 1
+            logger.warning(f"User cache L2 set failed: {err}")
+
+    async def _l2_delete(self, *keys: str) -> None:
+        if self.redis is None or not keys:
+            return
+        try:
+            await self.redis.delete(*keys)
+        except (RedisError, OSError) as err:
+            self.l2_errors += 1
+            logger.warning(f"User cache L2 delete failed: {err}")
+
+    async def _get_projection(self, user_id: Any) -> Optional[dict]:
+        key = self._key('id', user_id)
+        projection = self._l1_get(key)
+        if projection is not None:
+            self.l1_hits += 1
+            return projection
+
+        raw = await self._l2_get(key)
+        if raw is not None:
+            self.l2_hits += 1
+            projection = json.loads(raw)
+            self._l1_set(key, projection)
+            return projection
+        return None
+
+    async def _get_by(self, field: str, value: Any) -> Optional[UserModel]:
+        if not self.enabled:
+            return None
+        if field == 'id':
+            projection = await self._get_projection(value)
+        else:
+            key = self._key(field, value)
+            user_id = self._l1_get(key)
+            if user_id is None:
+                raw = await self._l2_get(key)
+                user_id = int(raw) if raw is not None else None
+            projection = await self._get_projection(user_id) if user_id is not None else None
+
+        # Index keys are never deleted, a stale one simply stops matching
+        if projection is None or projection.get(field) != value:
+            self.misses += 1
+            return None
+        # Entries written before a field left the projection only expose what is still in it
+        return UserModel(**{name: projection.get(name) for name in USER_FIELDS})
+
+    async def get_by_id(self, user_id: int) -> Optional[UserModel]:
+        return await self._get_by('id', user_id)
+
+    async def get_by_username(self, username: str) -> Optional[UserModel]:
+        return await self._get_by('username', username)
+
+    async def get_by_email(self, email: str) -> Optional[UserModel]:
+        return await self._get_by('email', email)
+
+    async def set(self, user: UserModel) -> None:
+        if not self.enabled:
+            return
+        projection = {field: getattr(user, field) for field in USER_FIELDS}
+        entries = {
+            self._key('id', user.id): projection,
+            self._key('username', user.username): user.id
+        }
+        if user.email:
+            entries[self._key('email', user.email)] = user.id
+
+        for key, value in entries.items():
+            self._l1_set(key, value)
+        await self._l2_set({key: json.dumps(value) for key, value in entries.items()})
+
+    async def invalidate(self, user_id: int) -> None:
+        key = self._key('id', user_id)
+        self._l1.pop(key, None)
+        await self._l2_delete(key)
+
+    async def clear(self) -> None:
+        self._l1.clear()
+        if self.redis is None:
+            return
+        try:
+            keys = [key async for key in self.redis.scan_iter(match=f"{self.prefix}:*", count=1000)]
+            for start in range(0, len(keys), 1000):
+                await self.redis.delete(*keys[start:start + 1000])
+        except (RedisError, OSError) as err:
+            self.l2_errors += 1
+            logger.warning(f"User cache L2 clear failed: {err}")
+
+    def stats(self) -> dict:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "l1_size": len(self._l1),
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "l2_errors": self.l2_errors,
+            "hit_rate": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+        }
+
+
+user_cache = UserCache(
+    redis=redis_helper.client,
+    enabled=settings.user_cache.enabled,
+    l1_size=settings.user_cache.l1_size,
+    l1_ttl=settings.user_cache.l1_ttl,
+    l2_ttl=settings.user_cache.l2_ttl
+)
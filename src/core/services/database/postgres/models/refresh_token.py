@@ -4,7 +4,7 @@ from sqlalchemy.orm import (
     Mapped,
     relationship
     )
-from sqlalchemy import String, ForeignKey, TypeDecorator, DateTime, Boolean
+from sqlalchemy import String, ForeignKey, TypeDecorator, DateTime, Boolean, Index, text
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any, Optional
 
@@ -28,11 +28,34 @@ class NaiveDateTime(TypeDecorator):
     
 
 class RefreshTokenModel(Base):
+    """
+    Range partitioned by expires_at (see token_partitions), so the partition key
+    is part of the primary key and previous_token_id is a plain column: Postgres
+    can't enforce a reference to a partitioned table without it.
+    """
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Unique indexes on a partitioned table have to include the partition key
+        Index("ix_refresh_tokens_token_expires_at", "token", "expires_at", unique=True),
+        # revoke_user / revoke_device only ever look at live rows
+        Index(
+            "ix_refresh_tokens_user_id_device_info_live",
+            "user_id", "device_info",
+            postgresql_where=text("NOT revoked")
+        ),
+        # Freshest live token of a user: ORDER BY created_at DESC LIMIT 1 reads one entry
+        Index(
+            "ix_refresh_tokens_user_id_created_at_live",
+            "user_id", text("created_at DESC"),
+            postgresql_where=text("NOT revoked")
+        ),
+        {"postgresql_partition_by": "RANGE (expires_at)"},
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     token: Mapped[str] = mapped_column(String(255), nullable=False)
-    expires_at: Mapped[datetime] = mapped_column(NaiveDateTime, nullable=False)
+    jti: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(NaiveDateTime, primary_key=True, index=True)
     revoked: Mapped[bool] = mapped_column(default=False)
     replaced_by_token: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
@@ -42,10 +65,7 @@ class RefreshTokenModel(Base):
     )
     family_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
     device_info: Mapped[Optional[str]] = mapped_column(String(200))
-    previous_token_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("refresh_tokens.id"), 
-        nullable=True
-    )
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    previous_token_id: Mapped[Optional[int]] = mapped_column(nullable=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
 
     user: Mapped["UserModel"] = relationship(back_populates="refresh_tokens")
\ No newline at end of file
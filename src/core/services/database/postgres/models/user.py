@@ -4,16 +4,13 @@ from sqlalchemy.orm import (
     Mapped, 
     relationship
     )
-from sqlalchemy.ext.asyncio import (
-    AsyncSession,
-    )
 from sqlalchemy import func, String
 from typing import Optional,List, TYPE_CHECKING
 import logging
-import bcrypt
 
 
 from src.core.services.database.postgres.models.base import Base, int_pk, created_at, updated_at
+from src.core.services.auth.hash_executor import hash_password, verify_password
 
 
 
@@ -22,6 +19,19 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Everything but the password hash, what listings and exports may project
+USER_PUBLIC_FIELDS = (
+    'id',
+    'username',
+    'public_name',
+    'email',
+    'bio',
+    'join_date',
+    'last_time_login',
+    'is_active',
+    'is_superuser'
+)
+
 
 class UserModel(Base):
     __tablename__ = 'users'
@@ -30,12 +40,13 @@ class UserModel(Base):
     username: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
     public_name: Mapped[Optional[str]] = mapped_column(String(100))
     password: Mapped[str] = mapped_column(String(128), nullable=False)
-    email: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    email: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, index=True)
     bio: Mapped[Optional[str]] = mapped_column(String(500))
     join_date: Mapped[created_at]
     last_time_login: Mapped[updated_at]
     is_active:Mapped[bool] = mapped_column(default=False)
     is_superuser: Mapped[bool] = mapped_column(default=False)
+    token_version: Mapped[int] = mapped_column(default=0, server_default='0')
 
     refresh_tokens: Mapped[List["RefreshTokenModel"]] = relationship(
         back_populates="user",
@@ -47,35 +58,9 @@ class UserModel(Base):
         return f"<User(id={self.id}, username={self.username})>"
     
     def set_password(self, password: str):
-        """Securely hash and store password"""
-        self.password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode()
+        """Securely hash and store password (blocking, prefer hash_executor in async code)"""
+        self.password = hash_password(password)
 
     def check_password(self, plaintext_password: str) -> bool:
-        """Verify password with automatic format correction"""
-            
-        try:
-            return bcrypt.checkpw(plaintext_password.encode('utf-8'), self.password.encode())
-        except Exception as err:
-            logger.error(f"Password verification failed for user {self.id}: {err}")
-            return False
-        
-    async def revoke_all_tokens(self, session:AsyncSession):
-        """Revoke all refresh tokens for this user"""
-        try:
-            # Explicitly load the refresh_tokens relationship
-            await session.refresh(self, ['refresh_tokens'])
-            
-            for token in self.refresh_tokens:
-                token.revoked = True
-                session.add(token)
-            
-            await session.commit()
-        except Exception as e:
-            await session.rollback()
-            raise e
-
-    def revoke_device_tokens(self, device_info: str):
-        """Revoke tokens for a specific device"""
-        for token in self.refresh_tokens:
-            if token.device_info == device_info:
-                token.revoked = True
+        """Verify password (blocking, prefer hash_executor in async code)"""
+        return verify_password(plaintext_password, self.password)
@@ -1,7 +1,8 @@
 from fastapi import HTTPException, status
+from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from sqlalchemy import select, update, delete, join
+from sqlalchemy import select, insert, update, delete, join, func, table, column
 from typing import Union, Optional
 from datetime import datetime, timezone
 import logging
@@ -10,13 +11,111 @@ from src.core.services.database.postgres.models.refresh_token import RefreshToke
 from src.core.services.database.postgres.models.user import UserModel
 from src.core.schemas.pydantic_schemas.auth_schema import RefreshToken
 from src.core.schemas.pydantic_schemas.user import UserSchema
+from src.core.services.auth.hash_executor import hash_executor
+from src.core.config.config import settings
 from src.core.config.auth_config import (
-    pwd_context
+    token_digest,
+    LEGACY_TOKEN_PREFIX
 )
 
 
 logger = logging.getLogger(__name__)
 
+def _live():
+    """
+    Partition pruning predicate: refresh_tokens is range partitioned by expires_at,
+    so every lookup of live tokens only touches the partitions that can still hold them
+    """
+    return RefreshTokenModel.expires_at > datetime.now(timezone.utc)
+
+# Live bcrypt-era rows of one user checked per lookup, a user has about one per device
+LEGACY_SCAN_LIMIT = 20
+
+def _legacy_fallback_open() -> bool:
+    until = settings.jwt.legacy_token_fallback_until
+    if until is None:
+        return False
+    if until.tzinfo is None:
+        until = until.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) < until
+
+async def _select_legacy_token(
+    session: AsyncSession,
+    token: str
+) -> Optional[RefreshTokenModel]:
+    """
+    Fallback for rows still hashed with bcrypt, only until jwt.legacy_token_fallback_until.
+    Only the token owner's live bcrypt rows are verified, at most LEGACY_SCAN_LIMIT of them,
+    so a miss can't turn into a bcrypt pass over the table. Nothing is written here,
+    the caller re-keys a match with rekey_refresh_token.
+    """
+    if not _legacy_fallback_open():
+        return None
+    try:
+        user_id = int(jwt.get_unverified_claims(token)["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+    stmt = (
+        select(RefreshTokenModel)
+        .where(
+            RefreshTokenModel.user_id == user_id,
+            RefreshTokenModel.token.startswith(LEGACY_TOKEN_PREFIX),
+            _live()
+        )
+        .limit(LEGACY_SCAN_LIMIT)
+    )
+    result = await session.execute(stmt)
+    for token_record in result.scalars().all():
+        if await hash_executor.verify_password(token, token_record.token):
+            return token_record
+    return None
+
+async def rekey_refresh_token(
+    session: AsyncSession,
+    token_id: int,
+    expires_at: datetime,
+    digest: str
+) -> None:
+    """Store the digest in place of a bcrypt-era hash, in the caller's transaction"""
+    stmt = (
+        update(RefreshTokenModel)
+        .where(RefreshTokenModel.id == token_id, RefreshTokenModel.expires_at == expires_at)
+        .values(token=digest)
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(stmt)
+
+async def select_refresh_token(
+    session: AsyncSession,
+    token: str
+) -> Optional[RefreshTokenModel]:
+    """Point lookup of a refresh token record by its raw value"""
+    stmt = select(RefreshTokenModel).where(RefreshTokenModel.token == token_digest(token), _live())
+    token_record = (await session.execute(stmt)).scalar_one_or_none()
+    if token_record is None:
+        token_record = await _select_legacy_token(session, token)
+    return token_record
+
+async def select_tokens_by_digests(
+    session: AsyncSession,
+    digests: list[str]
+) -> dict[str, RefreshTokenModel]:
+    """Refresh token records for a batch of digests, in one query"""
+    if not digests:
+        return {}
+    stmt = select(RefreshTokenModel).where(RefreshTokenModel.token.in_(digests), _live())
+    result = await session.execute(stmt)
+    return {token_record.token: token_record for token_record in result.scalars()}
+
+async def select_token_family_id(
+    session: AsyncSession,
+    token_id: int
+) -> Optional[str]:
+    """family_id of a live token; the primary key is (id, expires_at) so this is not a session.get"""
+    stmt = select(RefreshTokenModel.family_id).where(RefreshTokenModel.id == token_id, _live())
+    return (await session.execute(stmt)).scalar_one_or_none()
+
 async def select_data(
     session: AsyncSession,
     token: Optional[str] = None,
@@ -29,27 +128,18 @@ async def select_data(
         if model_type == RefreshToken:
             stmt = select(RefreshTokenModel)
             if token:
-                # Compare with all tokens using SQLAlchemy's ORM
-                # This is inefficient but works for small datasets
-                # For production, consider a different approach
-                result = await session.execute(select(RefreshTokenModel))
-                for token_record in result.scalars():
-                    if pwd_context.verify(token, token_record.token):
-                        return token_record
-                return None
+                return await select_refresh_token(session, token)
             if user_id:
-                stmt = stmt.where(RefreshTokenModel.user_id == user_id)
+                stmt = stmt.where(RefreshTokenModel.user_id == user_id, _live())
         else:
             stmt = select(UserModel)
             if user_id:
                 stmt = stmt.where(UserModel.id == user_id)
             if token:
-                # For UserModel + token query
-                result = await session.execute(select(RefreshTokenModel))
-                for token_record in result.scalars():
-                    if pwd_context.verify(token, token_record.token):
-                        return await session.get(UserModel, token_record.user_id)
-                return None
+                token_record = await select_refresh_token(session, token)
+                if token_record is None:
+                    return None
+                return await session.get(UserModel, token_record.user_id)
 
         if not token and not user_id:
             raise ValueError('Need to provide at least one argument (token or user_id)')
@@ -65,6 +155,50 @@ async def select_data(
             detail="Database error"
         )
     
+async def add_refresh_token(
+    session: AsyncSession,
+    data: RefreshToken
+) -> int:
+    """INSERT ... RETURNING id in the caller's transaction, no commit and no refresh"""
+    stmt = (
+        insert(RefreshTokenModel)
+        .values(
+            user_id=data.user_id,
+            token=data.token,
+            jti=data.jti,
+            expires_at=data.expires_at,
+            revoked=data.revoked,
+            replaced_by_token=data.replaced_by_token,
+            family_id=data.family_id,
+            previous_token_id=data.previous_token_id,
+            device_info=data.device_info
+        )
+        .returning(RefreshTokenModel.id)
+    )
+    return (await session.execute(stmt)).scalar_one()
+
+async def mark_token_replaced(
+    session: AsyncSession,
+    token_id: int,
+    expires_at: datetime,
+    replaced_by_token: str
+) -> bool:
+    """
+    Revoke a rotated-out token in the caller's transaction, no commit.
+    False when it was already revoked, i.e. a concurrent rotation got there first.
+    """
+    stmt = (
+        update(RefreshTokenModel)
+        .where(
+            RefreshTokenModel.id == token_id,
+            RefreshTokenModel.expires_at == expires_at,
+            ~RefreshTokenModel.revoked
+        )
+        .values(revoked=True, replaced_by_token=replaced_by_token)
+        .execution_options(synchronize_session=False)
+    )
+    return (await session.execute(stmt)).rowcount == 1
+
 async def insert_data(
     session: AsyncSession,
     data: RefreshToken
@@ -74,6 +208,7 @@ async def insert_data(
         token_model = RefreshTokenModel(
             user_id=data.user_id,
             token=data.token,
+            jti=data.jti,
             expires_at=data.expires_at,
             revoked=data.revoked,
             replaced_by_token=data.replaced_by_token,
@@ -114,13 +249,13 @@ async def delete_data(
                 logger.debug('bool(token and user_id)')
                 await session.execute(
                 delete(RefreshTokenModel)
-                .where(RefreshTokenModel.token == token and RefreshTokenModel.user_id == user_id))
+                .where(RefreshTokenModel.token == token, RefreshTokenModel.user_id == user_id, _live()))
                 await session.commit()
 
         if bool(token and not user_id): # 1 0
                 await session.execute(
                 delete(RefreshTokenModel)
-                .where(RefreshTokenModel.token == token))
+                .where(RefreshTokenModel.token == token, _live()))
                 await session.commit()
             
         if bool(not token and user_id): # 0 1
@@ -141,41 +276,177 @@ async def delete_data(
 
 async def delete_all_user_tokens(
         session:AsyncSession,
-          data: UserModel
+          user_id: int
           ):
     try:
         await session.execute(
                 delete(RefreshTokenModel)
-                .where(RefreshTokenModel.user_id == data.id))
+                .where(RefreshTokenModel.user_id == user_id))
         await session.commit()
     except Exception as err:
+        await session.rollback()
         logger.critical(f'Something unpredictable: {err}')
-    
-async def get_refresh_token_data(session: AsyncSession, token:str) -> RefreshTokenModel:
-    stm = (select(RefreshTokenModel).where(RefreshTokenModel.token == token))
-    result = (await session.execute(stm)).scalars().all()
-    valid_tokens:list[RefreshTokenModel] = []
-    for i in result:
-        if i.revoked:
-            continue
-        if i.expires_at <= datetime.now(timezone.utc):
-            continue
-        valid_tokens.append(i)
-
-    freshest = sorted(valid_tokens, key=lambda x:x.created_at)[:-1]
-    if freshest:
-        return freshest
-
-
-async def nuclear_option(session: AsyncSession):
-    """Delete ALL refresh tokens in the system (admin only)"""
+
+async def revoke_tokens(
+        session: AsyncSession,
+        user_id: Optional[int] = None,
+        device_info: Optional[str] = None,
+        family_id: Optional[str] = None,
+        token_ids: Optional[list[int]] = None
+) -> list[tuple[int, Optional[str], datetime]]:
+    """
+    Revoke every live token matching all given filters in one UPDATE.
+    Returns (id, jti, expires_at) of the rows that were revoked.
+    """
+    filters = [~RefreshTokenModel.revoked, _live()]
+    if user_id is not None:
+        filters.append(RefreshTokenModel.user_id == user_id)
+    if device_info is not None:
+        filters.append(RefreshTokenModel.device_info == device_info)
+    if family_id is not None:
+        filters.append(RefreshTokenModel.family_id == family_id)
+    if token_ids is not None:
+        filters.append(RefreshTokenModel.id.in_(token_ids))
+    if len(filters) == 2:
+        raise ValueError('Need to provide at least one filter (user_id, device_info, family_id or token_ids)')
+
     try:
-        await session.execute(delete(RefreshTokenModel))
+        stmt = (
+            update(RefreshTokenModel)
+            .where(*filters)
+            .values(revoked=True)
+            .returning(RefreshTokenModel.id, RefreshTokenModel.jti, RefreshTokenModel.expires_at)
+            .execution_options(synchronize_session=False)
+        )
+        rows = (await session.execute(stmt)).all()
         await session.commit()
-        logger.warning("Nuclear option executed - all refresh tokens purged")
+        return [(token_id, jti, expires_at) for token_id, jti, expires_at in rows]
+
+    except SQLAlchemyError as err:
+        await session.rollback()
+        logger.error(f"Failed to revoke tokens: {err}")
+        raise err
+
+def _refresh_token_filters(
+        token: Optional[str] = None,
+        user_id: Optional[int] = None,
+        family_id: Optional[str] = None,
+        device_info: Optional[str] = None,
+        include_revoked: bool = False
+) -> list:
+    """Validity is decided in SQL: expired rows never match, revoked ones only on request"""
+    filters = [_live()]
+    if not include_revoked:
+        filters.append(~RefreshTokenModel.revoked)
+    if token is not None:
+        filters.append(RefreshTokenModel.token == token)
+    if user_id is not None:
+        filters.append(RefreshTokenModel.user_id == user_id)
+    if family_id is not None:
+        filters.append(RefreshTokenModel.family_id == family_id)
+    if device_info is not None:
+        filters.append(RefreshTokenModel.device_info == device_info)
+    return filters
+
+async def select_latest_refresh_token(
+        session: AsyncSession,
+        token: Optional[str] = None,
+        user_id: Optional[int] = None,
+        family_id: Optional[str] = None,
+        device_info: Optional[str] = None,
+        include_revoked: bool = False
+) -> Optional[RefreshTokenModel]:
+    """
+    Freshest valid token matching the filters (token is the digest), one row whatever the history length.
+    Per user it is served by ix_refresh_tokens_user_id_created_at_live.
+    """
+    stmt = (
+        select(RefreshTokenModel)
+        .where(*_refresh_token_filters(token, user_id, family_id, device_info, include_revoked))
+        .order_by(RefreshTokenModel.created_at.desc())
+        .limit(1)
+    )
+    try:
+        return (await session.execute(stmt)).scalar_one_or_none()
+
+    except SQLAlchemyError as err:
+        logger.error(f"Failed to select latest refresh token: {err}")
+        raise err
+
+async def count_refresh_tokens(
+        session: AsyncSession,
+        token: Optional[str] = None,
+        user_id: Optional[int] = None,
+        family_id: Optional[str] = None,
+        device_info: Optional[str] = None,
+        include_revoked: bool = False
+) -> int:
+    """Number of valid tokens matching the filters, counted by the database"""
+    stmt = (
+        select(func.count())
+        .select_from(RefreshTokenModel)
+        .where(*_refresh_token_filters(token, user_id, family_id, device_info, include_revoked))
+    )
+    try:
+        return (await session.execute(stmt)).scalar_one()
+
+    except SQLAlchemyError as err:
+        logger.error(f"Failed to count refresh tokens: {err}")
+        raise err
+
+
+def _token_table(partition: Optional[str] = None):
+    """refresh_tokens itself, or one of its partitions addressed directly"""
+    if partition is None:
+        return RefreshTokenModel.__table__
+    columns = RefreshTokenModel.__table__.c
+    return table(partition, column('id', columns.id.type), column('expires_at', columns.expires_at.type))
+
+async def delete_token_batch(
+        session: AsyncSession,
+        batch_size: int = 1000,
+        purge_all: bool = False,
+        partition: Optional[str] = None
+) -> int:
+    """
+    Delete up to batch_size expired tokens (every token with purge_all) in a short transaction,
+    from the whole table or only from partition.
+    Rows locked by another worker are skipped, so concurrent reapers never wait on each other.
+    Revoked tokens stay until they expire, they are the evidence for reuse detection.
+    """
+    target = _token_table(partition)
+    victims = select(target.c.id)
+    if not purge_all:
+        victims = victims.where(target.c.expires_at <= datetime.now(timezone.utc))
+    victims = victims.limit(batch_size).with_for_update(skip_locked=True)
+
+    try:
+        result = await session.execute(
+            delete(target)
+            .where(target.c.id.in_(victims.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        return result.rowcount
+
+    except SQLAlchemyError as err:
+        await session.rollback()
+        logger.error(f"Failed to delete token batch: {err}")
+        raise err
+
+async def nuclear_option(session: AsyncSession, batch_size: int = 1000):
+    """Delete ALL refresh tokens in the system (admin only), in batches so no long lock is held"""
+    try:
+        deleted = 0
+        while True:
+            batch = await delete_token_batch(session, batch_size, purge_all=True)
+            deleted += batch
+            if batch < batch_size:
+                break
+        logger.warning(f"Nuclear option executed - {deleted} refresh tokens purged")
+        return deleted
 
     except Exception as e:
         await session.rollback()
         logger.critical(f"Failed nuclear option: {e}")
         raise e
-    
@@ -0,0 +1,144 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import text
+from datetime import datetime, timedelta
+import logging
+import re
+
+from src.core.services.database.postgres.models.refresh_token import RefreshTokenModel
+
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = RefreshTokenModel.__tablename__
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+# Advisory lock key every reaper process agrees on, any constant bigint works
+MAINTENANCE_LOCK_KEY = 0x72745F7061727473  # b'rt_parts'
+_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def partition_step(interval: str) -> timedelta:
+    return timedelta(weeks=1) if interval == 'week' else timedelta(days=1)
+
+def partition_floor(moment: datetime, interval: str) -> datetime:
+    """Start of the partition holding moment (naive UTC, weeks start on monday like date_trunc)"""
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    if interval == 'week':
+        start -= timedelta(days=start.weekday())
+    return start
+
+def partition_name(start: datetime) -> str:
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+async def _set_lock_timeout(session: AsyncSession, lock_timeout_ms: int) -> None:
+    await session.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+
+async def try_maintenance_lock(session: AsyncSession) -> bool:
+    """
+    Transaction-level advisory lock serializing partition maintenance across workers.
+    Doesn't wait: False means another worker is on it. Held until the session's transaction ends.
+    """
+    result = await session.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+    return bool(result.scalar_one())
+
+async def select_token_partitions(session: AsyncSession) -> list[tuple[str, datetime, datetime]]:
+    """(name, lower, upper) of every range partition, oldest first; the default partition is left out"""
+    result = await session.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent AS regclass)"
+        ),
+        {"parent": PARENT_TABLE}
+    )
+    partitions = []
+    for name, bound in result.all():
+        match = _BOUNDS.search(bound)
+        if match is None:
+            continue
+        partitions.append((name, datetime.fromisoformat(match[1]), datetime.fromisoformat(match[2])))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+async def create_token_partition(
+        session: AsyncSession,
+        start: datetime,
+        end: datetime,
+        lock_timeout_ms: int = 2000
+) -> str:
+    """
+    Build the partition as a plain table and ATTACH it: unlike CREATE TABLE ... PARTITION OF
+    this only takes SHARE UPDATE EXCLUSIVE on refresh_tokens, so logins keep going.
+    Rows that landed in the default partition for this range are moved over in the same transaction.
+    """
+    name = partition_name(start)
+    try:
+        await _set_lock_timeout(session, lock_timeout_ms)
+        await session.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)"))
+        await session.execute(
+            text(
+                f"WITH moved AS ("
+                f"DELETE FROM {DEFAULT_PARTITION} WHERE expires_at >= :start AND expires_at < :end RETURNING *"
+                f") INSERT INTO {name} SELECT * FROM moved"
+            ),
+            {"start": start, "end": end}
+        )
+        await session.execute(
+            text(
+                f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{start.isoformat(sep=' ')}') TO ('{end.isoformat(sep=' ')}')"
+            )
+        )
+        await session.commit()
+        logger.info(f"Created partition {name} [{start}, {end})")
+        return name
+
+    except SQLAlchemyError as err:
+        await session.rollback()
+        logger.error(f"Failed to create partition {name}: {err}")
+        raise err
+
+async def ensure_token_partitions(
+        session: AsyncSession,
+        now: datetime,
+        horizon: timedelta,
+        interval: str = 'week',
+        lock_timeout_ms: int = 2000
+) -> list[str]:
+    """Create partitions after the newest one until now + horizon is covered, returns the new names"""
+    partitions = await select_token_partitions(session)
+    start = partitions[-1][2] if partitions else partition_floor(now, interval)
+    until = now.replace(tzinfo=None) + horizon
+    created = []
+    while start < until:
+        end = partition_floor(start + partition_step(interval), interval)
+        created.append(await create_token_partition(session, start, end, lock_timeout_ms))
+        start = end
+    return created
+
+async def drop_expired_token_partitions(
+        session: AsyncSession,
+        now: datetime,
+        lock_timeout_ms: int = 2000
+) -> list[str]:
+    """
+    Expiry without row deletes: a partition whose upper bound is behind now only holds expired
+    tokens, so it is detached and dropped. Returns the dropped names.
+    """
+    now = now.replace(tzinfo=None)
+    dropped = []
+    for name, _, end in await select_token_partitions(session):
+        if end > now:
+            break
+        try:
+            await _set_lock_timeout(session, lock_timeout_ms)
+            await session.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            await session.execute(text(f"DROP TABLE {name}"))
+            await session.commit()
+            dropped.append(name)
+            logger.info(f"Dropped expired partition {name}")
+
+        except SQLAlchemyError as err:
+            await session.rollback()
+            logger.error(f"Failed to drop partition {name}: {err}")
+            raise err
+    return dropped
@@ -1,11 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from sqlalchemy import select, update, delete, join
-from typing import Union, Optional
+from sqlalchemy import select, update, delete, join, func
+from typing import AsyncIterator, Union, Optional, Sequence
 import logging
 
-from src.core.services.database.postgres.models.user import UserModel
+from src.core.services.database.postgres.models.user import UserModel, USER_PUBLIC_FIELDS
 from src.core.schemas.pydantic_schemas.user import UserSchema as User_pydantic
+from src.core.dependencies.db_helper import commit_and_release
+from src.core.dependencies.metrics import timed
+from src.core.services.auth.hash_executor import hash_executor
+from src.core.services.auth.principal import Principal
+from src.core.services.cache.user_cache import user_cache
 
 
 logger = logging.getLogger(__name__)
@@ -15,18 +20,128 @@ async def select_data_user_id(
         user_id:int
         ) -> Optional[UserModel]:
     try:
+        cached_user = await user_cache.get_by_id(user_id)
+        if cached_user is not None:
+            return cached_user
+
         query = select(UserModel).where(UserModel.id == user_id)
         result = await session.execute(query)
         data_user =  result.scalar_one_or_none()
 
         if not data_user: # if data_user is none its will raise an error
             return None
+        await user_cache.set(data_user)
         return data_user
     
     except Exception as err:
         logger.error(f"Failed to select user data: {str(err)}")
         raise err
 
+async def select_principal(
+        session: AsyncSession,
+        user_id: int
+        ) -> Optional[Principal]:
+    """Principal of the user from the cache or a query of just its columns, None if the user does not exist"""
+    try:
+        cached_user = await user_cache.get_by_id(user_id)
+        if cached_user is not None:
+            return Principal.from_user(cached_user)
+
+        query = select(*(getattr(UserModel, field) for field in Principal.FIELDS)).where(UserModel.id == user_id)
+        row = (await session.execute(query)).one_or_none()
+        return Principal(*row) if row is not None else None
+
+    except Exception as err:
+        logger.error(f"Failed to select principal: {str(err)}")
+        raise err
+
+async def select_user_model(
+        session: AsyncSession,
+        user_id: int
+        ) -> Optional[UserModel]:
+    """The full, session-attached model, bypassing the user cache"""
+    try:
+        return await session.get(UserModel, user_id)
+
+    except Exception as err:
+        logger.error(f"Failed to select user model: {str(err)}")
+        raise err
+
+async def select_token_version(
+        session: AsyncSession,
+        user_id: int
+        ) -> Optional[int]:
+    """Current token_version of the user, None if the user does not exist"""
+    try:
+        query = select(UserModel.token_version).where(UserModel.id == user_id)
+        return (await session.execute(query)).scalar_one_or_none()
+
+    except Exception as err:
+        logger.error(f"Failed to select token version: {str(err)}")
+        raise err
+
+async def bump_token_version(
+        session: AsyncSession,
+        user_id: int
+        ) -> Optional[int]:
+    """Invalidate every token issued to the user so far, returns the new version"""
+    try:
+        stm = (
+            update(UserModel)
+            .where(UserModel.id == user_id)
+            .values(token_version=UserModel.token_version + 1)
+            .returning(UserModel.token_version)
+        )
+        version = (await session.execute(stm)).scalar_one_or_none()
+        await session.commit()
+        await user_cache.invalidate(user_id)
+        return version
+
+    except Exception as err:
+        await session.rollback()
+        logger.error(f"Failed to bump token version: {str(err)}")
+        raise err
+
+async def select_user_states(
+        session: AsyncSession,
+        user_ids: list[int]
+        ) -> dict[int, tuple[bool, int]]:
+    """(is_active, token_version) for every existing user in user_ids, in one query"""
+    if not user_ids:
+        return {}
+    try:
+        query = select(UserModel.id, UserModel.is_active, UserModel.token_version).where(UserModel.id.in_(user_ids))
+        result = await session.execute(query)
+        return {user_id: (is_active, token_version) for user_id, is_active, token_version in result.all()}
+
+    except Exception as err:
+        logger.error(f"Failed to select user states: {str(err)}")
+        raise err
+
+async def verify_user_credentials(
+    session: AsyncSession,
+    username: str,
+    password: str
+) -> tuple[Optional[UserModel], Optional[str]]:
+    """
+    (user, new_hash) of a login attempt, user is None when the credentials don't match.
+    new_hash is set when the stored hash predates the current scheme or cost, nothing is written here.
+    The hash is always read from the row, the user cache does not hold it.
+    """
+    with timed('login', 'db'):
+        query = select(UserModel).where(UserModel.username == username)
+        data_user = (await session.execute(query)).scalar_one_or_none()
+        # Don't hold a pooled connection through the hash check
+        await commit_and_release(session)
+    if data_user is None:
+        return None, None
+
+    with timed('login', 'hash'):
+        verified, new_hash = await hash_executor.verify_and_update_password(password, data_user.password)
+    if not verified:
+        return None, None
+    return data_user, new_hash
+
 async def select_data_user(
     session: AsyncSession,
     username: str,
@@ -34,31 +149,71 @@ async def select_data_user(
 ) -> Optional[UserModel]:
    
     try:
-        query = select(UserModel).where(UserModel.username == username)
-        result = await session.execute(query)
-        data_user =  result.scalar_one_or_none()
-        if not data_user: # if data_user is none its will raise an error
-            return None
-        else:
-            if data_user.check_password(password): # if password is validates properly user returns and return None in any else cases
-                return data_user
-    
+        data_user, new_hash = await verify_user_credentials(session, username, password)
+        if data_user is not None and new_hash:
+            # Stored hash predates the current scheme or cost, upgrade it transparently
+            await update_password_hash(session, data_user.id, new_hash)
+            data_user.password = new_hash
+        return data_user
 
     except Exception as err:
         logger.error(f"Failed to select user data: {str(err)}")
         raise err
+
+async def record_login(
+        session: AsyncSession,
+        user_id: int,
+        password_hash: Optional[str] = None
+        ) -> Optional[UserModel]:
+    """
+    Activation, last login time and a pending hash upgrade as one UPDATE ... RETURNING.
+    Doesn't commit, the login unit of work does.
+    """
+    values = {"is_active": True, "last_time_login": func.timezone('UTC', func.now())}
+    if password_hash:
+        values["password"] = password_hash
+    stmt = (
+        update(UserModel)
+        .where(UserModel.id == user_id)
+        .values(**values)
+        .returning(UserModel)
+    )
+    return (await session.execute(stmt)).scalar_one_or_none()
     
+async def update_password_hash(
+        session: AsyncSession,
+        user_id: int,
+        password_hash: str
+        ) -> None:
+    try:
+        stm = update(UserModel).where(UserModel.id == user_id).values(password=password_hash)
+        await session.execute(stm)
+        await session.commit()
+        await user_cache.invalidate(user_id)
+        logger.info(f"Password hash of user {user_id} upgraded")
+
+    except Exception as err:
+        await session.rollback()
+        logger.error(f"Failed to upgrade password hash: {str(err)}")
+        raise err
+
 async def select_user_email(
     session: AsyncSession,
     data: Union[User_pydantic, str, int]
     ) -> Optional[UserModel]:
     try:
         if isinstance(data, str):
+            cached_user = await user_cache.get_by_email(data)
+            if cached_user is not None:
+                return cached_user
             query = select(UserModel).where(UserModel.email == data)
             
 
         result = await session.execute(query)
-        return result.scalar_one_or_none()
+        data_user = result.scalar_one_or_none()
+        if data_user is not None:
+            await user_cache.set(data_user)
+        return data_user
 
     except ValueError as err:
         logger.error(f"select_user_email doesn't support such method {type(data)} {str(err)}")
@@ -78,10 +233,11 @@ async def insert_data(
             res = User_pydantic.model_validate(data, from_attributes=True)
             user_data = {i: k for i, k in res.model_dump().items() if i != 'password_again'}
             new_data = UserModel(**user_data)
-            new_data.set_password(new_data.password)
+            new_data.password = await hash_executor.hash_password(new_data.password)
             session.add(new_data)
             await session.commit()
             await session.refresh(new_data)  # Refresh to get any database-generated values
+            await user_cache.invalidate(new_data.id)
             logger.debug('Create user success')
             return new_data
         else:
@@ -108,6 +264,7 @@ async def update_data(
 
         await session.execute(stm)
         await session.commit()
+        await user_cache.invalidate(data_id)
 
 async def delete_users(
             session:AsyncSession
@@ -117,12 +274,51 @@ async def delete_users(
 
     await session.execute(stm)
     await session.commit()
+    await user_cache.clear()
+
+def _user_columns(fields: Sequence[str]) -> list:
+    unknown = set(fields) - set(USER_PUBLIC_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown user fields: {', '.join(sorted(unknown))}")
+    # id always comes first, it is the keyset
+    return [UserModel.id] + [getattr(UserModel, field) for field in fields if field != 'id']
+
+async def select_users_page(
+        session: AsyncSession,
+        after: Optional[int] = None,
+        limit: int = 100,
+        fields: Sequence[str] = USER_PUBLIC_FIELDS
+) -> tuple[list[dict], Optional[int]]:
+    """
+    One keyset page ordered by id: (rows projected to fields, id to pass as after for the next page).
+    Cost doesn't depend on the page number, the primary key index seeks straight to after.
+    """
+    query = select(*_user_columns(fields)).order_by(UserModel.id).limit(limit + 1)
+    if after is not None:
+        query = query.where(UserModel.id > after)
+    try:
+        rows = (await session.execute(query)).mappings().all()
+    except SQLAlchemyError as err:
+        logger.error(f"Failed to select users page: {str(err)}")
+        raise err
 
-async def get_all_users(session:AsyncSession):
-    query = select(UserModel)
-    res = await session.execute(query)
-    result = res.scalars().all()
-    return result
+    next_after = rows[limit - 1]['id'] if len(rows) > limit else None
+    return [dict(row) for row in rows[:limit]], next_after
+
+async def stream_users(
+        session: AsyncSession,
+        fields: Sequence[str] = USER_PUBLIC_FIELDS,
+        batch_size: int = 1000
+) -> AsyncIterator[list[dict]]:
+    """Every user in id order, fetched from a server-side cursor batch_size rows at a time"""
+    query = (
+        select(*_user_columns(fields))
+        .order_by(UserModel.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await session.stream(query)
+    async for partition in result.mappings().partitions():
+        yield [dict(row) for row in partition]
 
 async def user_activate(session:AsyncSession, user_id:int, activate:bool):
     query = select(UserModel).where(UserModel.id == user_id)
@@ -132,12 +328,16 @@ async def user_activate(session:AsyncSession, user_id:int, activate:bool):
         raise ValueError(f"User with id {user_id} not found")
     
     user.is_active = activate
+    if not activate:
+        # Access tokens carry is_active, so deactivation must outdate them
+        user.token_version = UserModel.token_version + 1
     
     # Commit the changes
     await session.commit()
     
     # Refresh the user object if needed
     await session.refresh(user)
+    await user_cache.invalidate(user_id)
     
     return user
     
\ No newline at end of file
@@ -0,0 +1,37 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from datetime import datetime, timezone
+from asyncpg import Connection
+from types import SimpleNamespace
+from typing import Optional
+
+
+# Any statement run through SQLAlchemy opens the session's transaction on the connection
+BEGIN_TRANSACTION = text("SELECT 1")
+
+
+async def driver_connection(session: AsyncSession, write: bool = False) -> Connection:
+    """
+    asyncpg connection of the session. Statements run on it are prepared once and kept
+    in asyncpg's per-connection statement cache, so a hot query is parse/plan-free.
+    Reads join the session's transaction when one is open and run on their own otherwise.
+    write marks the request as having written, so a routing session picks the primary, and
+    makes sure the session's transaction is open so the write commits and rolls back with it.
+    """
+    if write and session.info.get('state') is not None:
+        session.info['state']['wrote'] = True
+    connection = await session.connection()
+    driver = (await connection.get_raw_connection()).driver_connection
+    if write and not driver.is_in_transaction():
+        await connection.execute(BEGIN_TRANSACTION)
+    return driver
+
+def record(row) -> Optional[SimpleNamespace]:
+    """Attribute access over an asyncpg row, all the callers ever read from a model"""
+    return SimpleNamespace(**row) if row is not None else None
+
+def naive_utc(value: datetime) -> datetime:
+    """refresh_tokens timestamps are naive UTC columns (see NaiveDateTime)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.replace(tzinfo=None)
@@ -0,0 +1,78 @@
+"""
+asyncpg twins of the hot token_crud queries, same signatures, plain records instead of
+RefreshTokenModel instances and no pydantic-to-model copying on insert.
+Picked through repository.token_repo when settings.db.repository is asyncpg.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Optional
+import logging
+
+from src.core.config.auth_config import token_digest
+from src.core.schemas.pydantic_schemas.auth_schema import RefreshToken
+from src.core.services.database.postgres.orm.token_crud import _select_legacy_token
+from src.core.services.database.postgres.raw.driver import driver_connection, record, naive_utc
+
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = (
+    "id, token, jti, expires_at, revoked, replaced_by_token, created_at, "
+    "family_id, device_info, previous_token_id, user_id"
+)
+# expires_at > $2 keeps partition pruning, same as token_crud._live()
+SELECT_BY_DIGEST = f"SELECT {COLUMNS} FROM refresh_tokens WHERE token = $1 AND expires_at > $2"
+INSERT = (
+    "INSERT INTO refresh_tokens (user_id, token, jti, expires_at, revoked, replaced_by_token, "
+    "family_id, previous_token_id, device_info, created_at) "
+    "VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10) RETURNING id"
+)
+MARK_REPLACED = (
+    "UPDATE refresh_tokens SET revoked = true, replaced_by_token = $3 "
+    "WHERE id = $1 AND expires_at = $2 AND NOT revoked"
+)
+
+async def select_refresh_token(
+    session: AsyncSession,
+    token: str
+) -> Optional[SimpleNamespace]:
+    """Point lookup of a refresh token record by its raw value, bcrypt-era rows fall back to the ORM"""
+    connection = await driver_connection(session)
+    token_record = record(await connection.fetchrow(
+        SELECT_BY_DIGEST, token_digest(token), naive_utc(datetime.now(timezone.utc))
+    ))
+    if token_record is None:
+        token_record = await _select_legacy_token(session, token)
+    return token_record
+
+async def add_refresh_token(
+    session: AsyncSession,
+    data: RefreshToken
+) -> int:
+    """INSERT ... RETURNING id in the caller's transaction, no commit"""
+    connection = await driver_connection(session, write=True)
+    return await connection.fetchval(
+        INSERT,
+        data.user_id,
+        data.token,
+        data.jti,
+        naive_utc(data.expires_at),
+        data.revoked,
+        data.replaced_by_token,
+        data.family_id,
+        data.previous_token_id,
+        data.device_info,
+        naive_utc(datetime.now(timezone.utc))
+    )
+
+async def mark_token_replaced(
+    session: AsyncSession,
+    token_id: int,
+    expires_at: datetime,
+    replaced_by_token: str
+) -> bool:
+    """Revoke a rotated-out token in the caller's transaction, False if it was already revoked"""
+    connection = await driver_connection(session, write=True)
+    status = await connection.execute(MARK_REPLACED, token_id, naive_utc(expires_at), replaced_by_token)
+    return status == 'UPDATE 1'
@@ -0,0 +1,95 @@
+"""
+asyncpg twins of the hot user_orm queries, same signatures, plain records instead of
+UserModel instances: no identity map, no attribute instrumentation, no statement compiling.
+Picked through repository.user_repo when settings.db.repository is asyncpg.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from types import SimpleNamespace
+from typing import Optional
+import logging
+
+from src.core.dependencies.db_helper import commit_and_release
+from src.core.dependencies.metrics import timed
+from src.core.services.auth.hash_executor import hash_executor
+from src.core.services.auth.principal import Principal
+from src.core.services.cache.user_cache import user_cache, USER_FIELDS
+from src.core.services.database.postgres.raw.driver import driver_connection, record
+
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ', '.join((*USER_FIELDS, 'join_date', 'last_time_login'))
+SELECT_BY_ID = f"SELECT {COLUMNS} FROM users WHERE id = $1"
+SELECT_PRINCIPAL = f"SELECT {', '.join(Principal.FIELDS)} FROM users WHERE id = $1"
+SELECT_BY_USERNAME = f"SELECT {COLUMNS}, password FROM users WHERE username = $1"
+RECORD_LOGIN = (
+    "UPDATE users SET is_active = true, last_time_login = timezone('UTC', now()), "
+    f"password = coalesce($2, password) WHERE id = $1 RETURNING {COLUMNS}"
+)
+
+async def select_data_user_id(
+        session: AsyncSession,
+        user_id: int
+        ) -> Optional[SimpleNamespace]:
+    try:
+        cached_user = await user_cache.get_by_id(user_id)
+        if cached_user is not None:
+            return cached_user
+
+        connection = await driver_connection(session)
+        data_user = record(await connection.fetchrow(SELECT_BY_ID, user_id))
+        if data_user is None:
+            return None
+        await user_cache.set(data_user)
+        return data_user
+
+    except Exception as err:
+        logger.error(f"Failed to select user data: {str(err)}")
+        raise err
+
+async def select_principal(
+        session: AsyncSession,
+        user_id: int
+        ) -> Optional[Principal]:
+    """Principal of the user from the cache or a query of just its columns"""
+    try:
+        cached_user = await user_cache.get_by_id(user_id)
+        if cached_user is not None:
+            return Principal.from_user(cached_user)
+
+        connection = await driver_connection(session)
+        row = await connection.fetchrow(SELECT_PRINCIPAL, user_id)
+        return Principal(*row) if row is not None else None
+
+    except Exception as err:
+        logger.error(f"Failed to select principal: {str(err)}")
+        raise err
+
+async def verify_user_credentials(
+    session: AsyncSession,
+    username: str,
+    password: str
+) -> tuple[Optional[SimpleNamespace], Optional[str]]:
+    """(user, new_hash) of a login attempt, see user_orm.verify_user_credentials"""
+    with timed('login', 'db'):
+        connection = await driver_connection(session)
+        data_user = record(await connection.fetchrow(SELECT_BY_USERNAME, username))
+        # Don't hold a pooled connection through the hash check
+        await commit_and_release(session)
+    if data_user is None:
+        return None, None
+
+    with timed('login', 'hash'):
+        verified, new_hash = await hash_executor.verify_and_update_password(password, data_user.password)
+    if not verified:
+        return None, None
+    return data_user, new_hash
+
+async def record_login(
+        session: AsyncSession,
+        user_id: int,
+        password_hash: Optional[str] = None
+        ) -> Optional[SimpleNamespace]:
+    """Activation, last login time and a pending hash upgrade in one UPDATE ... RETURNING, no commit"""
+    connection = await driver_connection(session, write=True)
+    return record(await connection.fetchrow(RECORD_LOGIN, user_id, password_hash))
@@ -0,0 +1,13 @@
+"""
+Backend of the hottest auth queries, chosen by settings.db.repository:
+orm - user_orm / token_crud, asyncpg - raw prepared statements returning plain records.
+Both expose the same functions, callers import user_repo / token_repo from here.
+"""
+from src.core.config.config import settings
+
+if settings.db.repository == 'asyncpg':
+    from src.core.services.database.postgres.raw import user_raw as user_repo
+    from src.core.services.database.postgres.raw import token_raw as token_repo
+else:
+    from src.core.services.database.postgres.orm import user_orm as user_repo
+    from src.core.services.database.postgres.orm import token_crud as token_repo
@@ -0,0 +1,126 @@
+"""refresh tokens partitioned by expires_at
+
+Revision ID: 7fac26711c56
+Revises: bbbde78a348f
+Create Date: 2025-06-23 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7fac26711c56'
+down_revision: Union[str, None] = 'bbbde78a348f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    'id, token, jti, expires_at, revoked, replaced_by_token, created_at, '
+    'family_id, device_info, previous_token_id, user_id'
+)
+# Weekly partitions up to here, the reaper keeps extending them at runtime
+PREMAKE = timedelta(weeks=8)
+
+
+def _create_indexes() -> None:
+    op.create_index(op.f('ix_refresh_tokens_id'), 'refresh_tokens', ['id'], unique=False)
+    op.create_index(op.f('ix_refresh_tokens_family_id'), 'refresh_tokens', ['family_id'], unique=False)
+    op.create_index(op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the id sequence, the new table takes it over
+    op.execute('ALTER SEQUENCE refresh_tokens_id_seq OWNED BY NONE')
+    op.rename_table('refresh_tokens', 'refresh_tokens_unpartitioned')
+    op.execute('ALTER INDEX refresh_tokens_pkey RENAME TO refresh_tokens_unpartitioned_pkey')
+
+    # The partition key has to be part of the primary key, and a foreign key can't
+    # point at a partitioned table without it, so previous_token_id becomes a plain column
+    op.create_table(
+        'refresh_tokens',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('refresh_tokens_id_seq')"), nullable=False),
+        sa.Column('token', sa.String(length=255), nullable=False),
+        sa.Column('jti', sa.String(length=36), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('revoked', sa.Boolean(), nullable=False),
+        sa.Column('replaced_by_token', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('family_id', sa.String(length=36), nullable=False),
+        sa.Column('device_info', sa.String(length=200), nullable=True),
+        sa.Column('previous_token_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id', 'expires_at'),
+        postgresql_partition_by='RANGE (expires_at)'
+    )
+    op.execute('ALTER SEQUENCE refresh_tokens_id_seq OWNED BY refresh_tokens.id')
+    op.execute('CREATE TABLE refresh_tokens_default PARTITION OF refresh_tokens DEFAULT')
+
+    now = op.get_bind().execute(sa.text("SELECT timezone('UTC', now())")).scalar_one()
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=now.weekday())
+    latest = op.get_bind().execute(sa.text('SELECT max(expires_at) FROM refresh_tokens_unpartitioned')).scalar()
+    until = max(now + PREMAKE, latest or now)
+    while start <= until:
+        end = start + timedelta(weeks=1)
+        op.execute(
+            f"CREATE TABLE refresh_tokens_p{start:%Y%m%d} PARTITION OF refresh_tokens "
+            f"FOR VALUES FROM ('{start.isoformat(sep=' ')}') TO ('{end.isoformat(sep=' ')}')"
+        )
+        start = end
+
+    # Expired rows would go straight to the reaper, leave them behind
+    op.execute(
+        f"INSERT INTO refresh_tokens ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM refresh_tokens_unpartitioned "
+        f"WHERE expires_at > timezone('UTC', now())"
+    )
+    op.drop_table('refresh_tokens_unpartitioned')
+    _create_indexes()
+    op.create_index(op.f('ix_refresh_tokens_token'), 'refresh_tokens', ['token'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('ALTER SEQUENCE refresh_tokens_id_seq OWNED BY NONE')
+    op.rename_table('refresh_tokens', 'refresh_tokens_partitioned')
+    op.execute('ALTER INDEX refresh_tokens_pkey RENAME TO refresh_tokens_partitioned_pkey')
+    for index in ('ix_refresh_tokens_id', 'ix_refresh_tokens_family_id', 'ix_refresh_tokens_expires_at', 'ix_refresh_tokens_token'):
+        op.drop_index(index, table_name='refresh_tokens_partitioned')
+
+    op.create_table(
+        'refresh_tokens',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('refresh_tokens_id_seq')"), nullable=False),
+        sa.Column('token', sa.String(length=255), nullable=False),
+        sa.Column('jti', sa.String(length=36), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('revoked', sa.Boolean(), nullable=False),
+        sa.Column('replaced_by_token', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('family_id', sa.String(length=36), nullable=False),
+        sa.Column('device_info', sa.String(length=200), nullable=True),
+        sa.Column('previous_token_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute('ALTER SEQUENCE refresh_tokens_id_seq OWNED BY refresh_tokens.id')
+    op.execute(f"INSERT INTO refresh_tokens ({COLUMNS}) SELECT {COLUMNS} FROM refresh_tokens_partitioned")
+    op.drop_table('refresh_tokens_partitioned')
+
+    # Ancestors dropped with their partition leave dangling references behind
+    op.execute(
+        'UPDATE refresh_tokens SET previous_token_id = NULL '
+        'WHERE previous_token_id IS NOT NULL '
+        'AND previous_token_id NOT IN (SELECT id FROM refresh_tokens)'
+    )
+    op.create_foreign_key(
+        'refresh_tokens_previous_token_id_fkey', 'refresh_tokens', 'refresh_tokens',
+        ['previous_token_id'], ['id'], ondelete='SET NULL'
+    )
+    _create_indexes()
+    op.create_index(op.f('ix_refresh_tokens_token'), 'refresh_tokens', ['token'], unique=True)
@@ -0,0 +1,43 @@
+"""refresh token digest
+
+Revision ID: 8e4503206d61
+Revises: fb8854cc9c83
+Create Date: 2025-05-26 12:00:00.000000
+
+Refresh tokens are looked up by an HMAC digest from now on. Rows written before
+hold bcrypt hashes, which can't be turned into digests, so an existing database
+needs one of:
+
+- keep them usable: set FAST__JWT__LEGACY_TOKEN_FALLBACK_UNTIL to the deploy time
+  plus REFRESH_TOKEN_EXPIRE_DAYS. A bcrypt row is re-keyed when it is rotated,
+  and after the deadline no live bcrypt row can remain.
+- log those sessions out: DELETE FROM refresh_tokens WHERE token LIKE '$2%'
+
+Databases created before migrations existed (tables made by create_all) have the
+fb8854cc9c83 schema already: run `alembic stamp fb8854cc9c83` once, then
+`alembic upgrade head`.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4503206d61'
+down_revision: Union[str, None] = 'fb8854cc9c83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows keep their bcrypt hashes (salted, so still unique) and are
+    # re-keyed to the HMAC digest the first time they are looked up.
+    op.create_index(op.f('ix_refresh_tokens_token'), 'refresh_tokens', ['token'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_refresh_tokens_token'), table_name='refresh_tokens')
@@ -0,0 +1,28 @@
+"""refresh token jti
+
+Revision ID: 9aa412fa2e61
+Revises: a1a2b9b0dc32
+Create Date: 2025-06-09 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9aa412fa2e61'
+down_revision: Union[str, None] = 'a1a2b9b0dc32'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('jti', sa.String(length=36), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('refresh_tokens', 'jti')
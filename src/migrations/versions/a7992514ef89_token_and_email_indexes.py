@@ -0,0 +1,78 @@
+"""token and email indexes
+
+Revision ID: a7992514ef89
+Revises: 7fac26711c56
+Create Date: 2025-06-30 12:00:00.000000
+
+Built online: CREATE INDEX CONCURRENTLY doesn't work on a partitioned table,
+so each refresh_tokens index is created ON ONLY the parent (invalid, no lock on
+the partitions), built CONCURRENTLY on every partition and attached; the parent
+index turns valid once the last partition index is attached. Partitions created
+later by the reaper get the indexes on ATTACH.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7992514ef89'
+down_revision: Union[str, None] = '7fac26711c56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# name: (partition index suffix, UNIQUE or '', definition)
+TOKEN_INDEXES = {
+    'ix_refresh_tokens_token_expires_at': ('token_key', 'UNIQUE', '(token, expires_at)'),
+    'ix_refresh_tokens_user_id': ('user_id', '', '(user_id)'),
+    'ix_refresh_tokens_user_id_device_info_live': ('user_live', '', '(user_id, device_info) WHERE NOT revoked'),
+}
+
+
+def _partitions() -> list[str]:
+    return op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST('refresh_tokens' AS regclass)"
+    )).scalars().all()
+
+
+def _create_partitioned_index(name: str, suffix: str, unique: str, definition: str) -> None:
+    partitions = _partitions()
+    op.execute(f"CREATE {unique} INDEX IF NOT EXISTS {name} ON ONLY refresh_tokens {definition}")
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(
+                f"CREATE {unique} INDEX CONCURRENTLY IF NOT EXISTS {partition}_{suffix} "
+                f"ON {partition} {definition}"
+            )
+    for partition in partitions:
+        op.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition}_{suffix}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, (suffix, unique, definition) in TOKEN_INDEXES.items():
+        _create_partitioned_index(name, suffix, unique, definition)
+
+    # Superseded by the unique digest index and the (id, expires_at) primary key
+    op.drop_index(op.f('ix_refresh_tokens_token'), table_name='refresh_tokens')
+    op.drop_index(op.f('ix_refresh_tokens_id'), table_name='refresh_tokens')
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_users_email'), 'users', ['email'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_users_email'), table_name='users', postgresql_concurrently=True)
+
+    op.create_index(op.f('ix_refresh_tokens_id'), 'refresh_tokens', ['id'], unique=False)
+    op.create_index(op.f('ix_refresh_tokens_token'), 'refresh_tokens', ['token'], unique=False)
+    for name in TOKEN_INDEXES:
+        op.drop_index(name, table_name='refresh_tokens')
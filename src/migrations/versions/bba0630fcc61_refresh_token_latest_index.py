@@ -0,0 +1,45 @@
+"""refresh token latest index
+
+Revision ID: bba0630fcc61
+Revises: a7992514ef89
+Create Date: 2025-07-07 12:00:00.000000
+
+Built online the same way as a7992514ef89: ON ONLY the parent, CONCURRENTLY
+on every partition, then attached.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bba0630fcc61'
+down_revision: Union[str, None] = 'a7992514ef89'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NAME = 'ix_refresh_tokens_user_id_created_at_live'
+SUFFIX = 'user_latest'
+DEFINITION = '(user_id, created_at DESC) WHERE NOT revoked'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    partitions = op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST('refresh_tokens' AS regclass)"
+    )).scalars().all()
+
+    op.execute(f"CREATE INDEX IF NOT EXISTS {NAME} ON ONLY refresh_tokens {DEFINITION}")
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_{SUFFIX} ON {partition} {DEFINITION}")
+    for partition in partitions:
+        op.execute(f"ALTER INDEX {NAME} ATTACH PARTITION {partition}_{SUFFIX}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(NAME, table_name='refresh_tokens')
@@ -0,0 +1,39 @@
+"""refresh token chain set null
+
+Revision ID: bbbde78a348f
+Revises: 9aa412fa2e61
+Create Date: 2025-06-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bbbde78a348f'
+down_revision: Union[str, None] = '9aa412fa2e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Reaped tokens may still be referenced by their successors
+    op.drop_constraint('refresh_tokens_previous_token_id_fkey', 'refresh_tokens', type_='foreignkey')
+    op.create_foreign_key(
+        'refresh_tokens_previous_token_id_fkey', 'refresh_tokens', 'refresh_tokens',
+        ['previous_token_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index(op.f('ix_refresh_tokens_expires_at'), 'refresh_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_refresh_tokens_expires_at'), table_name='refresh_tokens')
+    op.drop_constraint('refresh_tokens_previous_token_id_fkey', 'refresh_tokens', type_='foreignkey')
+    op.create_foreign_key(
+        'refresh_tokens_previous_token_id_fkey', 'refresh_tokens', 'refresh_tokens',
+        ['previous_token_id'], ['id']
+    )
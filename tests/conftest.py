@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+# Settings are read at import time, give them values before src is imported
+for name, value in {
+    "FAST__DB__NAME": "test",
+    "FAST__DB__USER": "test",
+    "FAST__DB__PASSWORD": "test",
+    "FAST__JWT__KEY": "test-secret",
+    "FAST__FACEBOOK__CLIENT_ID": "test",
+    "FAST__FACEBOOK__CLIENT_SECRET": "test",
+    "FAST__FACEBOOK__REDIRECT_URI": "http://localhost/facebook",
+    "FAST__GITHUB__CLIENT_ID": "test",
+    "FAST__GITHUB__CLIENT_SECRET": "test",
+    "FAST__GITHUB__REDIRECT_URI": "http://localhost/github",
+    "FAST__STACKOVERFLOW__CLIENT_ID": "test",
+    "FAST__STACKOVERFLOW__CLIENT_SECRET": "test",
+    "FAST__STACKOVERFLOW__REDIRECT_URI": "http://localhost/stackoverflow",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -0,0 +1,64 @@
+import pytest
+
+from src.core.services.auth import token_service as token_service_module
+from src.core.services.auth.token_service import TokenService
+
+
+class NotRevoked:
+    async def is_revoked(self, jti: str) -> bool:
+        return False
+
+
+@pytest.fixture
+def service(monkeypatch):
+    async def no_tokens(session, digests):
+        return {}
+
+    monkeypatch.setattr(token_service_module, "select_tokens_by_digests", no_tokens)
+    return TokenService(revoked=NotRevoked())
+
+
+def user_states(states: dict):
+    async def select_user_states(session, user_ids):
+        return {user_id: states[user_id] for user_id in user_ids if user_id in states}
+    return select_user_states
+
+
+async def access_token(service: TokenService, ver: int) -> str:
+    return await service.create_access_token({"sub": "1", "ver": ver})
+
+
+@pytest.mark.anyio
+async def test_current_token_version_is_active(service, monkeypatch):
+    monkeypatch.setattr(token_service_module, "select_user_states", user_states({1: (True, 1)}))
+    token = await access_token(service, ver=1)
+
+    [result] = await service.introspect_tokens(None, [token])
+
+    assert result["active"] is True
+    assert result["sub"] == "1"
+
+
+@pytest.mark.anyio
+async def test_outdated_token_version_is_inactive(service, monkeypatch):
+    monkeypatch.setattr(token_service_module, "select_user_states", user_states({1: (True, 2)}))
+    token = await access_token(service, ver=1)
+
+    assert await service.introspect_tokens(None, [token]) == [{"active": False}]
+
+
+@pytest.mark.anyio
+async def test_token_without_version_is_inactive_after_bump(service, monkeypatch):
+    monkeypatch.setattr(token_service_module, "select_user_states", user_states({1: (True, 1)}))
+    token = await service.create_access_token({"sub": "1"})
+
+    assert await service.introspect_tokens(None, [token]) == [{"active": False}]
+
+
+@pytest.mark.anyio
+async def test_inactive_or_missing_user_is_inactive(service, monkeypatch):
+    monkeypatch.setattr(token_service_module, "select_user_states", user_states({1: (False, 0)}))
+    inactive = await access_token(service, ver=0)
+    missing = await service.create_access_token({"sub": "2", "ver": 0})
+
+    assert await service.introspect_tokens(None, [inactive, missing]) == [{"active": False}] * 2
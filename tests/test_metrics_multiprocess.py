@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.core.dependencies import metrics
+
+
+@pytest.fixture
+def multiproc_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    return tmp_path
+
+
+def dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_reap_dead_workers_drops_only_their_live_gauges(multiproc_dir):
+    dead, alive = dead_pid(), os.getpid()
+    for name in (
+        f'gauge_livesum_{dead}.db',
+        f'gauge_livemostrecent_{dead}.db',
+        f'counter_{dead}.db',
+        f'gauge_livesum_{alive}.db',
+    ):
+        (multiproc_dir / name).touch()
+
+    assert metrics.reap_dead_workers() == [dead]
+    assert sorted(path.name for path in multiproc_dir.iterdir()) == [
+        f'counter_{dead}.db',
+        f'gauge_livesum_{alive}.db',
+    ]
+
+
+def test_mark_worker_dead_drops_own_live_gauges(multiproc_dir):
+    (multiproc_dir / f'gauge_livesum_{os.getpid()}.db').touch()
+    (multiproc_dir / f'histogram_{os.getpid()}.db').touch()
+
+    metrics.mark_worker_dead()
+
+    assert [path.name for path in multiproc_dir.iterdir()] == [f'histogram_{os.getpid()}.db']
+
+
+def test_clear_multiproc_dir(multiproc_dir):
+    (multiproc_dir / 'counter_1.db').touch()
+    (multiproc_dir / 'gauge_livesum_1.db').touch()
+
+    metrics.clear_multiproc_dir()
+
+    assert list(multiproc_dir.iterdir()) == []
+
+
+def test_single_process_mode_is_left_alone(monkeypatch):
+    monkeypatch.delenv('PROMETHEUS_MULTIPROC_DIR', raising=False)
+
+    assert metrics.reap_dead_workers() == []
+    metrics.mark_worker_dead()
+    metrics.clear_multiproc_dir()
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.util import greenlet_spawn
+
+from src.core.dependencies.pool_metrics import InstrumentedQueuePool, instrument_pool, pool_stats
+
+
+class FakeDBAPIConnection:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def make_pool(name: str, **kwargs) -> InstrumentedQueuePool:
+    pool = InstrumentedQueuePool(FakeDBAPIConnection, pool_size=1, max_overflow=1, timeout=0.01, **kwargs)
+    instrument_pool(pool, name)
+    return pool
+
+
+@pytest.mark.anyio
+async def test_checkouts_overflow_and_wait_are_exported():
+    pool = make_pool('test_occupancy')
+
+    def scenario():
+        first, second = pool.connect(), pool.connect()
+        during = pool_stats([pool], 'test_occupancy')
+        with pytest.raises(PoolTimeoutError):
+            pool.connect()
+        second.close()
+        first.close()
+        return during
+
+    during = await greenlet_spawn(scenario)
+    after = pool_stats([pool], 'test_occupancy')
+
+    assert during["checked_out"] == 2 and during["overflow"] == 1
+    assert after["checked_out"] == 0 and after["overflow"] == 0
+    assert after["timeouts"] == 1
+    assert after["connects"] == 2 and after["closes"] == 1
+    assert after["checkout_seconds"]["count"] == 2
+    assert after["held_seconds"]["count"] == 2
+    assert after["wait_seconds"] >= 0
+
+
+@pytest.mark.anyio
+async def test_recreated_pool_keeps_its_series():
+    pool = make_pool('test_recreate')
+    pool.dispose()
+    recreated = pool.recreate()
+
+    def scenario():
+        recreated.connect().close()
+
+    await greenlet_spawn(scenario)
+
+    assert pool_stats([recreated], 'test_recreate')["checkout_seconds"]["count"] == 1
+
+
+@pytest.mark.anyio
+async def test_replicas_share_the_engine_label():
+    replicas = [make_pool('test_replica'), make_pool('test_replica')]
+
+    def scenario():
+        held = [pool.connect() for pool in replicas]
+        stats = pool_stats(replicas, 'test_replica')
+        for connection in held:
+            connection.close()
+        return stats
+
+    stats = await greenlet_spawn(scenario)
+
+    assert stats["pools"] == 2 and stats["size"] == 2
+    assert stats["checked_out"] == 2
+    assert pool_stats(replicas, 'test_replica')["checked_out"] == 0
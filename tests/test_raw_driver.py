@@ -0,0 +1,71 @@
+import pytest
+
+from src.core.services.database.postgres.raw.driver import driver_connection
+
+
+class FakeDriver:
+    def __init__(self, in_transaction: bool):
+        self.in_transaction = in_transaction
+
+    def is_in_transaction(self) -> bool:
+        return self.in_transaction
+
+
+class FakeRawConnection:
+    def __init__(self, driver: FakeDriver):
+        self.driver_connection = driver
+
+
+class FakeConnection:
+    def __init__(self, driver: FakeDriver):
+        self.driver = driver
+        self.executed = []
+
+    async def get_raw_connection(self):
+        return FakeRawConnection(self.driver)
+
+    async def execute(self, statement):
+        # SQLAlchemy's asyncpg adapter begins its transaction on the first statement
+        self.executed.append(str(statement))
+        self.driver.in_transaction = True
+
+
+class FakeSession:
+    def __init__(self, in_transaction: bool = False):
+        self.bind = FakeConnection(FakeDriver(in_transaction))
+        self.info = {"state": {"wrote": False}}
+
+    async def connection(self):
+        return self.bind
+
+
+@pytest.mark.anyio
+async def test_read_runs_without_opening_a_transaction():
+    session = FakeSession()
+
+    driver = await driver_connection(session)
+
+    assert driver is session.bind.driver
+    assert session.bind.executed == []
+    assert session.info["state"]["wrote"] is False
+
+
+@pytest.mark.anyio
+async def test_write_opens_the_session_transaction_once():
+    session = FakeSession()
+
+    driver = await driver_connection(session, write=True)
+    await driver_connection(session, write=True)
+
+    assert driver.is_in_transaction()
+    assert session.bind.executed == ["SELECT 1"]
+    assert session.info["state"]["wrote"] is True
+
+
+@pytest.mark.anyio
+async def test_write_joins_an_open_transaction():
+    session = FakeSession(in_transaction=True)
+
+    await driver_connection(session, write=True)
+
+    assert session.bind.executed == []
@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy import String, create_engine, delete, insert, select, update
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.pool import StaticPool
+
+from src.core.dependencies.db_helper import PrimarySession, RoutingSession
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Node(Base):
+    """Each database holds one row naming it, a read tells which one answered"""
+    __tablename__ = "node"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(16))
+
+
+def make_engine(name: str):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Node).values(id=1, name=name))
+    return engine
+
+
+@pytest.fixture
+def primary():
+    engine = make_engine("primary")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def replica():
+    engine = make_engine("replica")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def state():
+    return {"wrote": False, "checkouts": 0, "held": 0.0}
+
+
+def read_session(primary, replica, state) -> RoutingSession:
+    """Same wiring as DbHelper.read_session, with sync engines"""
+    session = RoutingSession(autoflush=False, expire_on_commit=False)
+    session.info['primary'] = primary
+    session.info['replica'] = replica
+    session.info['state'] = state
+    return session
+
+
+def answered_by(session) -> str:
+    return session.scalar(select(Node.name).where(Node.id == 1))
+
+
+def test_read_goes_to_the_replica(primary, replica, state):
+    with read_session(primary, replica, state) as session:
+        assert session.get_bind(clause=select(Node)) is replica
+        assert answered_by(session) == "replica"
+    assert state["wrote"] is False
+
+
+@pytest.mark.parametrize("statement", [
+    insert(Node).values(id=2, name="new"),
+    update(Node).where(Node.id == 1).values(name="changed"),
+    delete(Node).where(Node.id == 1),
+])
+def test_write_goes_to_the_primary(primary, replica, state, statement):
+    with read_session(primary, replica, state) as session:
+        assert session.get_bind(clause=statement) is primary
+        session.execute(statement)
+        session.commit()
+    assert state["wrote"] is True
+    with replica.connect() as connection:
+        assert connection.scalar(select(Node.name).where(Node.id == 1)) == "replica"
+        assert connection.scalar(select(Node.name).where(Node.id == 2)) is None
+
+
+def test_reads_follow_a_write_through_dbdi_to_the_primary(primary, replica, state):
+    with read_session(primary, replica, state) as reader:
+        assert answered_by(reader) == "replica"
+        reader.commit()
+
+        with PrimarySession(bind=primary, autoflush=False, expire_on_commit=False) as writer:
+            writer.info['state'] = state
+            writer.add(Node(id=2, name="written"))
+            writer.commit()
+
+        assert state["wrote"] is True
+        assert reader.get_bind(clause=select(Node)) is primary
+        assert answered_by(reader) == "primary"
+        assert reader.scalar(select(Node.name).where(Node.id == 2)) == "written"
+
+
+def test_primary_is_used_without_replicas(primary, state):
+    with read_session(primary, None, state) as session:
+        assert session.get_bind(clause=select(Node)) is primary
+        assert answered_by(session) == "primary"
+    assert state["wrote"] is False
@@ -0,0 +1,55 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.v1.auth.authentication import router
+from src.core.config.config import settings
+from src.core.dependencies.auth_deps import get_auth_service
+from src.core.middleware.server_timing import ServerTimingMiddleware
+
+
+class FakeTokenService:
+    async def set_secure_cookies(self, response, tokens):
+        response.set_cookie(key='access', value=tokens['access'])
+        return response
+
+
+class FakeAuthService:
+    token_service = FakeTokenService()
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    async def authenticate_user(self, username, password):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+@pytest.fixture
+def login(monkeypatch):
+    monkeypatch.setattr(settings.rate_limit, 'enabled', False)
+
+    def login(outcome):
+        app = FastAPI()
+        app.include_router(router)
+        app.add_middleware(ServerTimingMiddleware)
+        app.dependency_overrides[get_auth_service] = lambda: FakeAuthService(outcome)
+        with TestClient(app) as client:
+            return client.post(
+                settings.prefix.api_data.prefix + '/login/process',
+                data={'username': 'alice', 'password': 'secret'},
+                follow_redirects=False
+            )
+    return login
+
+
+@pytest.mark.parametrize('outcome', [
+    {'access': 'a', 'refresh': 'r', 'csrf': 'c'},
+    None,
+    RuntimeError('database is down'),
+], ids=['success', 'invalid_credentials', 'error'])
+def test_login_times_render_on_every_path(login, outcome):
+    response = login(outcome)
+
+    assert 'render;dur=' in response.headers['server-timing']
@@ -0,0 +1,70 @@
+import pytest
+
+from src.core.services.auth import token_reaper as token_reaper_module
+from src.core.services.auth.token_reaper import TokenReaper
+from src.core.services.database.postgres.orm.token_partitions import DEFAULT_PARTITION
+
+
+class FakeSessionFactory:
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.mark.anyio
+async def test_sweep_deletes_default_partition_in_batches(monkeypatch):
+    calls = []
+    batches = iter([3, 3, 1])
+
+    async def delete_token_batch(session, batch_size, purge_all=False, partition=None):
+        calls.append((batch_size, purge_all, partition))
+        return next(batches)
+
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(token_reaper_module, "delete_token_batch", delete_token_batch)
+    monkeypatch.setattr(token_reaper_module.asyncio, "sleep", sleep)
+    reaper = TokenReaper(FakeSessionFactory(), batch_size=3, pause=0.5)
+
+    assert await reaper.sweep_default() == 7
+    assert calls == [(3, False, DEFAULT_PARTITION)] * 3
+    # Paused between full batches, not after the short one
+    assert sleeps == [0.5, 0.5]
+    assert reaper.stats()["batches_total"] == 3
+
+
+@pytest.mark.parametrize('locked', [True, False], ids=['lock_held', 'lock_free'])
+@pytest.mark.anyio
+async def test_maintain_runs_only_under_the_advisory_lock(monkeypatch, locked):
+    calls = []
+
+    async def try_maintenance_lock(session):
+        return not locked
+
+    async def ensure_token_partitions(session, *args):
+        calls.append('ensure')
+        return ['refresh_tokens_p20260101']
+
+    async def drop_expired_token_partitions(session, *args):
+        calls.append('drop')
+        return []
+
+    monkeypatch.setattr(token_reaper_module, "try_maintenance_lock", try_maintenance_lock)
+    monkeypatch.setattr(token_reaper_module, "ensure_token_partitions", ensure_token_partitions)
+    monkeypatch.setattr(token_reaper_module, "drop_expired_token_partitions", drop_expired_token_partitions)
+    reaper = TokenReaper(FakeSessionFactory())
+
+    await reaper.maintain()
+
+    if locked:
+        assert calls == [] and reaper.stats()["passes_skipped"] == 1
+    else:
+        assert calls == ['ensure', 'drop'] and reaper.stats()["partitions_created"] == 1
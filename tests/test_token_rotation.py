@@ -0,0 +1,124 @@
+from fastapi import HTTPException
+from types import SimpleNamespace
+import pytest
+
+from src.core.config.auth_config import REFRESH_TYPE
+from src.core.services.auth import token_service as token_service_module
+from src.core.services.auth.token_service import TokenService
+
+
+class FakeRevocationList:
+    """In-memory revocation list, what Redis holds when it is up"""
+
+    def __init__(self):
+        self.revoked: set[str] = set()
+
+    async def is_revoked(self, jti: str) -> bool:
+        return jti in self.revoked
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        self.revoked.add(jti)
+
+
+class FakeRevocations:
+    def __init__(self):
+        self.families: list[str] = []
+
+    async def revoke_reused(self, session, token_record) -> int:
+        self.families.append(token_record.family_id)
+        return 1
+
+
+class FakeTokenRepo:
+    """refresh_tokens rows keyed by digest"""
+
+    def __init__(self):
+        self.rows: dict[str, SimpleNamespace] = {}
+
+    async def select_refresh_token(self, session, token):
+        return self.rows.get(token_service_module.token_digest(token))
+
+    async def add_refresh_token(self, session, data) -> int:
+        self.rows[data.token] = SimpleNamespace(
+            id=len(self.rows) + 1, token=data.token, revoked=False, family_id=data.family_id,
+            expires_at=data.expires_at, device_info=data.device_info
+        )
+        return self.rows[data.token].id
+
+    async def mark_token_replaced(self, session, token_id, expires_at, replaced_by_token) -> bool:
+        row = next(row for row in self.rows.values() if row.id == token_id)
+        if row.revoked:
+            return False
+        row.revoked = True
+        return True
+
+
+class FakeUserRepo:
+    async def select_principal(self, session, user_id):
+        return SimpleNamespace(id=user_id, username='alice', is_active=True, is_superuser=False, token_version=0)
+
+
+class FakeSession:
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    repo = FakeTokenRepo()
+    monkeypatch.setattr(token_service_module, "token_repo", repo)
+    monkeypatch.setattr(token_service_module, "user_repo", FakeUserRepo())
+    return repo
+
+
+@pytest.fixture
+def service(repo):
+    return TokenService(revoked=FakeRevocationList(), revocations=FakeRevocations())
+
+
+async def issue(service: TokenService, repo: FakeTokenRepo) -> str:
+    token = await service.create_refresh_token({"sub": "1", "ver": 0})
+    digest = service.hash_token(token)
+    repo.rows[digest] = SimpleNamespace(
+        id=len(repo.rows) + 1, token=digest, revoked=False, family_id='family-1',
+        expires_at=None, device_info=None
+    )
+    return token
+
+
+async def assert_reuse_detected(service: TokenService, token: str) -> None:
+    with pytest.raises(HTTPException) as err:
+        await service.rotate_tokens(FakeSession(), token)
+    assert err.value.detail == "Refresh token was reused"
+    assert service.revocations.families == ['family-1']
+
+
+@pytest.mark.anyio
+async def test_replayed_rotated_token_revokes_its_family(service, repo):
+    token = await issue(service, repo)
+    await service.rotate_tokens(FakeSession(), token)
+    # The rotation put the old jti on the revocation list
+    assert service.revocation_list.revoked
+
+    await assert_reuse_detected(service, token)
+
+
+@pytest.mark.anyio
+async def test_replay_is_detected_from_the_row_without_the_revocation_list(service, repo):
+    token = await issue(service, repo)
+    await service.rotate_tokens(FakeSession(), token)
+    service.revocation_list.revoked.clear()
+
+    await assert_reuse_detected(service, token)
+
+
+@pytest.mark.anyio
+async def test_verify_token_still_rejects_revoked_jti(service, repo):
+    token = await issue(service, repo)
+    await service.rotate_tokens(FakeSession(), token)
+
+    with pytest.raises(HTTPException):
+        await service.verify_token(token, REFRESH_TYPE)
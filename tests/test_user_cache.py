@@ -0,0 +1,233 @@
+import fakeredis
+import pytest
+from redis.exceptions import ConnectionError
+
+from src.core.services.cache import user_cache as user_cache_module
+from src.core.services.cache.user_cache import UserCache
+from src.core.services.database.postgres.models.user import UserModel
+from src.core.services.database.postgres.orm import user_orm
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class BrokenRedis:
+    """Every command fails like an unreachable server"""
+
+    def __getattr__(self, name):
+        raise ConnectionError("redis is down")
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    def __init__(self, result=None):
+        self.result = result
+        self.commits = 0
+
+    async def execute(self, statement):
+        return FakeResult(self.result)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def refresh(self, instance):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(user_cache_module.time, "monotonic", clock.monotonic)
+    return clock
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeAsyncRedis()
+
+
+@pytest.fixture
+def cache(redis, clock, monkeypatch):
+    cache = UserCache(redis=redis, l1_size=100, l1_ttl=5, l2_ttl=300)
+    monkeypatch.setattr(user_orm, "user_cache", cache)
+    return cache
+
+
+def make_user(**overrides) -> UserModel:
+    fields = {
+        "id": 1,
+        "username": "alice",
+        "public_name": "Alice",
+        "password": "$argon2id$hash",
+        "email": "alice@example.com",
+        "bio": None,
+        "is_active": True,
+        "is_superuser": False,
+        "token_version": 0,
+    }
+    fields.update(overrides)
+    return UserModel(**fields)
+
+
+@pytest.mark.anyio
+async def test_l1_hit(cache):
+    await cache.set(make_user())
+
+    user = await cache.get_by_id(1)
+
+    assert user.username == "alice"
+    assert cache.l1_hits == 1 and cache.l2_hits == 0
+
+
+@pytest.mark.anyio
+async def test_l2_hit_after_l1_expiry(cache, clock):
+    await cache.set(make_user())
+    clock.now += 6
+
+    user = await cache.get_by_username("alice")
+
+    assert user.id == 1
+    assert cache.l2_hits == 1
+    # The L2 hit warmed L1 again
+    assert (await cache.get_by_id(1)) is not None
+    assert cache.l1_hits == 1
+
+
+@pytest.mark.anyio
+async def test_l2_hit_from_another_worker(cache, redis):
+    await cache.set(make_user())
+    other = UserCache(redis=redis)
+
+    user = await other.get_by_email("alice@example.com")
+
+    assert user.id == 1
+    assert other.l1_hits == 0 and other.l2_hits == 1
+
+
+@pytest.mark.anyio
+async def test_miss(cache):
+    assert await cache.get_by_id(1) is None
+    assert await cache.get_by_username("nobody") is None
+    assert cache.misses == 2
+    assert cache.stats()["hit_rate"] == 0.0
+
+
+@pytest.mark.anyio
+async def test_l2_entries_expire_after_l2_ttl(cache, redis):
+    await cache.set(make_user())
+
+    for key in ("user:id:1", "user:username:alice", "user:email:alice@example.com"):
+        assert 0 < await redis.ttl(key) <= 300
+
+
+@pytest.mark.anyio
+async def test_password_hash_is_never_cached(cache, redis):
+    await cache.set(make_user())
+
+    assert b"argon2" not in await redis.get("user:id:1")
+    assert (await cache.get_by_id(1)).password is None
+
+
+@pytest.mark.anyio
+async def test_stale_index_key_does_not_match(cache, clock):
+    await cache.set(make_user())
+    await cache.set(make_user(username="alice2"))
+    clock.now += 6
+
+    # user:username:alice still points at 1, whose projection is now alice2
+    assert await cache.get_by_username("alice") is None
+    assert (await cache.get_by_username("alice2")).id == 1
+
+
+@pytest.mark.anyio
+async def test_redis_errors_fall_back_to_l1(clock):
+    cache = UserCache(redis=BrokenRedis(), l1_ttl=5)
+
+    await cache.set(make_user())
+    assert (await cache.get_by_id(1)).username == "alice"
+
+    clock.now += 6
+    assert await cache.get_by_id(1) is None
+    await cache.invalidate(1)
+    await cache.clear()
+    assert cache.l2_errors == 4
+
+
+@pytest.mark.anyio
+async def test_disabled_cache(redis):
+    cache = UserCache(redis=redis, enabled=False)
+    await cache.set(make_user())
+
+    assert await cache.get_by_id(1) is None
+    assert await redis.keys("*") == []
+
+
+async def assert_invalidated(cache, redis):
+    assert await redis.get("user:id:1") is None
+    assert await cache.get_by_id(1) is None
+
+
+@pytest.mark.anyio
+async def test_update_password_hash_invalidates(cache, redis):
+    await cache.set(make_user())
+
+    await user_orm.update_password_hash(FakeSession(), 1, "$argon2id$new")
+
+    await assert_invalidated(cache, redis)
+
+
+@pytest.mark.anyio
+async def test_user_activate_invalidates(cache, redis):
+    await cache.set(make_user())
+    session = FakeSession(result=make_user())
+
+    await user_orm.user_activate(session, 1, False)
+
+    assert session.commits == 1
+    await assert_invalidated(cache, redis)
+
+
+@pytest.mark.anyio
+async def test_bump_token_version_invalidates(cache, redis):
+    await cache.set(make_user())
+
+    assert await user_orm.bump_token_version(FakeSession(result=1), 1) == 1
+
+    await assert_invalidated(cache, redis)
+
+
+@pytest.mark.anyio
+async def test_login_reads_the_hash_from_the_database(cache, monkeypatch):
+    await cache.set(make_user())
+    session = FakeSession(result=make_user(password="$argon2id$from-db"))
+    verified = []
+
+    async def verify_and_update_password(password, password_hash):
+        verified.append(password_hash)
+        return True, None
+
+    async def commit_and_release(session):
+        pass
+
+    monkeypatch.setattr(user_orm.hash_executor, "verify_and_update_password", verify_and_update_password)
+    monkeypatch.setattr(user_orm, "commit_and_release", commit_and_release)
+
+    user, new_hash = await user_orm.verify_user_credentials(session, "alice", "secret")
+
+    assert user.id == 1 and new_hash is None
+    assert verified == ["$argon2id$from-db"]
@@ -0,0 +1,65 @@
+import io
+import threading
+
+import pytest
+
+from src.core.services.auth import user_import
+from src.core.services.auth.hash_executor import hash_executor
+from src.core.services.auth.user_import import UserImporter, read_rows
+
+
+class FakeExecutor:
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, fn, *args):
+        self.calls += 1
+        return f"hashed:{args[0]}"
+
+
+class RecordingImporter(UserImporter):
+    """Loads into a list instead of COPY, remembers the threads rows were validated on"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loaded = []
+        self.threads = set()
+
+    def _validate(self, report, line, row):
+        self.threads.add(threading.get_ident())
+        return super()._validate(report, line, row)
+
+    async def _load(self, users):
+        self.loaded.append(users)
+        return {user['username'] for user in users}
+
+
+CSV = (
+    "username,password,email\n"
+    "alice,secret1,alice@example.com\n"
+    "bob,secret2,\n"
+    "alice,secret3,\n"
+    ",missing,\n"
+    "carol,secret4,\n"
+)
+
+
+@pytest.mark.anyio
+async def test_import_validates_off_the_event_loop():
+    executor = FakeExecutor()
+    importer = RecordingImporter(None, executor, chunk_size=2)
+
+    report = await importer.import_rows(read_rows(io.StringIO(CSV), 'csv'))
+
+    assert report.imported == 3
+    assert report.duplicates == 1 and report.duplicate_usernames == ['alice']
+    assert report.invalid == 1 and report.errors[0].line == 5
+    assert [[user['username'] for user in chunk] for chunk in importer.loaded] == [['alice', 'bob'], ['carol']]
+    assert importer.loaded[0][0]['password'] == 'hashed:secret1'
+    assert executor.calls == 3
+    assert threading.get_ident() not in importer.threads
+
+
+def test_import_has_its_own_executor():
+    assert user_import.user_importer.executor is user_import.import_executor
+    assert user_import.import_executor is not hash_executor